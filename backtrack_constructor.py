@@ -1,13 +1,23 @@
 import os
 import random
+from array import array
 from metrics_record import MetricsLogger
+from maze_cli import script_options
+from maze_profile import attach_profiler
+from maze_grid import MazeGrid, EAST, SOUTH
+
+# Déplacements (dx, dy) vers les cellules voisines, dans l'ordre historique
+MOVES = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+# Mur cassé pour chaque direction (porté par la cellule courante pour 0 et 2,
+# par la cellule voisine pour 1 et 3)
+MOVE_WALLS = [SOUTH, SOUTH, EAST, EAST]
 
 class MazeGeneratorRecursive:
-    def __init__(self, n, seed=None):
+    def __init__(self, n, seed=None, logger=None):
         self.n = n
         self.size = 2 * n + 1
-        self.grid = [["#" for _ in range(self.size)] for _ in range(self.size)]
-        self.visited = set()
+        self.grid = MazeGrid(n)
+        self.visited = bytearray(n * n)
         self.seed = seed
         
         if seed is not None:
@@ -15,66 +25,131 @@ class MazeGeneratorRecursive:
         
         # Répertoire de sauvegarde
         self.save_dir = r"C:\Users\Windows\Desktop\projets\2a\amazing-mazes\recursive_grids"
-        os.makedirs(self.save_dir, exist_ok=True)
         
-        # Chemin absolu pour le fichier CSV
-        csv_path = r"C:\Users\Windows\Desktop\projets\2a\amazing-mazes\constructors_metrics.csv"
-        self.logger = MetricsLogger(csv_file=csv_path)
+        # Chemin absolu pour le fichier CSV (sauf logger fourni, ex. registre de générateurs)
+        if logger is None:
+            csv_path = r"C:\Users\Windows\Desktop\projets\2a\amazing-mazes\constructors_metrics.csv"
+            logger = MetricsLogger(csv_file=csv_path)
+        self.logger = logger
 
     def _get_neighbors(self, x, y):
-        """Retourne les voisins accessibles non visités"""
-        moves = [(0, 2), (0, -2), (2, 0), (-2, 0)]
-        neighbors = []
-        
-        for dx, dy in moves:
+        """Retourne les directions (indices dans MOVES) des voisins non visités"""
+        directions = []
+
+        for d, (dx, dy) in enumerate(MOVES):
             nx, ny = x + dx, y + dy
-            if 0 < nx < self.size - 1 and 0 < ny < self.size - 1 and (nx, ny) not in self.visited:
-                neighbors.append((nx, ny))
-                
-        return neighbors
-
-    def _recursive_backtracking(self, x, y):
-        """Algorithme récursif de génération du labyrinthe"""
-        # Marquer la cellule comme visitée
-        self.visited.add((x, y))
-        self.grid[y][x] = "."
-        
-        # Obtenir les voisins dans un ordre aléatoire
-        neighbors = self._get_neighbors(x, y)
-        random.shuffle(neighbors)
-        
-        for nx, ny in neighbors:
-            if (nx, ny) not in self.visited:
-                # Casser le mur entre les deux cellules
-                wall_x, wall_y = (x + nx) // 2, (y + ny) // 2
-                self.grid[wall_y][wall_x] = "."
-                self.logger.increment_edge()  # Compter l'arête traitée
-                
-                # Explorer récursivement
-                self._recursive_backtracking(nx, ny)
-                
-                # Compter le backtracking si nécessaire
-                if any(n not in self.visited for n in self._get_neighbors(x, y)):
-                    self.logger.increment_backtrack()
+            if 0 <= nx < self.n and 0 <= ny < self.n and not self.visited[ny * self.n + nx]:
+                directions.append(d)
+
+        return directions
+
+    def _iterative_backtracking(self, x, y):
+        """Backtracking avec pile explicite (même labyrinthe que la version récursive).
+
+        Chaque cadre de pile tient dans deux entiers : la cellule (index à plat)
+        et les directions restantes à explorer, codées sur 2 bits
+        chacune avec leur nombre en bits 8-10. La profondeur n'est donc limitée
+        que par la mémoire, plus par la limite de récursion de Python.
+
+        Les retours arrière ne sont comptés que si le logger compte (niveau
+        summary : entier local transmis à la fin, detailed : un appel par
+        événement) ; les arêtes cassées valent toujours n² - 1.
+        """
+        n = self.n
+        walls = memoryview(self.grid.walls.reshape(-1))
+        visited = self.visited
+        logger = self.logger
+        counting, detailed = logger.counting, logger.detailed
+        backtracks = 0
+        shuffle = random.shuffle
+        offsets = [dy * n + dx for dx, dy in MOVES]
+
+        stack_cells = array("q")
+        stack_state = array("q")
+
+        def visit(cell):
+            # Marquer la cellule comme visitée et tirer l'ordre de ses voisins
+            visited[cell] = 1
+            cy, cx = divmod(cell, n)
+            directions = self._get_neighbors(cx, cy)
+            shuffle(directions)
+            state = len(directions) << 8
+            for k, d in enumerate(directions):
+                state |= d << (2 * k)
+            stack_cells.append(cell)
+            stack_state.append(state)
+
+        visit(y * n + x)
+        returning = False
+        while stack_cells:
+            cell = stack_cells[-1]
+            state = stack_state[-1]
+            count, code = state >> 8, state & 0xFF
+
+            # Retour d'un enfant : compter le backtracking s'il reste des voisins
+            # non visités. Les directions déjà dépilées ont toutes été visitées,
+            # il suffit donc de regarder celles qui restent.
+            if returning:
+                returning = False
+                remaining, c = code, count
+                while counting and c:
+                    if not visited[cell + offsets[remaining & 3]]:
+                        if detailed:
+                            logger.increment_backtrack()
+                        else:
+                            backtracks += 1
+                        break
+                    remaining >>= 2
+                    c -= 1
+
+            # Prochain voisin encore libre
+            nxt = -1
+            while count:
+                d = code & 3
+                target = cell + offsets[d]
+                code >>= 2
+                count -= 1
+                if not visited[target]:
+                    nxt = target
+                    break
+
+            if nxt < 0:
+                stack_cells.pop()
+                stack_state.pop()
+                returning = True
+                continue
+
+            stack_state[-1] = (count << 8) | code
+
+            # Casser le mur entre les deux cellules
+            owner = nxt if d & 1 else cell
+            walls[owner] &= ~MOVE_WALLS[d] & 0xFF
+            if detailed:
+                logger.increment_edge()  # Compter l'arête traitée
+
+            visit(nxt)
+
+        if counting and not detailed:
+            logger.increment_backtrack(backtracks)
+            logger.increment_edge(n * n - 1)  # arbre couvrant : une arête par cellule sauf la première
 
     def generate(self):
         """Lance la génération du labyrinthe"""
         self.logger.start(maze_size=self.n, algorithm="recursive_backtracking", seed=self.seed)
-        self._recursive_backtracking(1, 1)
-        
-        # Ajouter l'entrée et la sortie
-        self.grid[0][1] = "."
-        self.grid[self.size - 1][self.size - 2] = "."
+        # L'entrée et la sortie sont portées par MazeGrid
+        with self.logger.phase("carve"):
+            self._iterative_backtracking(0, 0)
+        self.logger.end_timing()  # l'écriture du fichier n'entre pas dans le temps de génération
 
     def save_to_file(self, seed_input="default"):
         """Sauvegarde le labyrinthe et enregistre les métriques"""
         # Créer le nom de fichier avec le chemin complet
+        os.makedirs(self.save_dir, exist_ok=True)
         filename = os.path.join(self.save_dir, f"recursive_maze_{self.n}_{seed_input}")
         
-        # Écrire le labyrinthe dans le fichier
-        with open(filename, "w") as f:
-            for row in self.grid:
-                f.write("".join(row) + "\n")
+        # Écrire le labyrinthe dans le fichier (phase "io" des métriques)
+        with self.logger.phase("io"):
+            self.grid.save(filename)
         
         # Arrêter le chrono et enregistrer les métriques
         # (c'est ici que les données sont écrites dans le CSV)
@@ -87,8 +162,8 @@ class MazeGeneratorRecursive:
     def print_maze(self):
         """Affiche le labyrinthe dans la console (si petite taille)"""
         if self.size <= 50:
-            for row in self.grid:
-                print("".join(row))
+            for line in self.grid.iter_lines():
+                print(line)
         else:
             print(f"Labyrinthe trop grand pour l'affichage ({self.size}x{self.size})")
 
@@ -103,6 +178,8 @@ if __name__ == "__main__":
         generator = MazeGeneratorRecursive(n, seed=int(seed_input))
     else:
         generator = MazeGeneratorRecursive(n)
+    # --profile [sample|cprofile] : profil écrit à côté du labyrinthe
+    attach_profiler(script_options().profile, generator.logger, generator, "generate")
     
     # Générer le labyrinthe
     print("Génération en cours...")
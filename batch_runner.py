@@ -0,0 +1,275 @@
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+# Les imports lourds (NumPy, PIL, générateurs) sont faits dans les processus
+# de travail : le processus principal ne fait qu'ordonnancer.
+GENERATOR_CSV = "constructors_metrics.csv"
+SOLVER_CSV = "solver_metrics.csv"
+
+
+def parse_seeds(values):
+    """Graines données une à une ou par plages : 1 2 5-9."""
+    seeds = []
+    for value in values:
+        if "-" in value.lstrip("-"):
+            start, end = value.split("-", 1)
+            seeds.extend(range(int(start), int(end) + 1))
+        else:
+            seeds.append(int(value))
+    return seeds
+
+
+def build_jobs(algorithms, sizes, seeds, repeat, warmup, options):
+    """Matrice tailles x graines x algorithmes, avec échauffements et répétitions.
+
+    Les échauffements (une graine par couple algorithme/taille) ne sont pas
+    enregistrés dans les CSV ni pris en compte dans le résumé.
+    """
+    jobs = []
+    for algorithm in algorithms:
+        for n in sizes:
+            for w in range(warmup):
+                jobs.append(dict(options, algorithm=algorithm, n=n, seed=seeds[0], run=w, warmup=True))
+            for seed in seeds:
+                for run in range(repeat):
+                    jobs.append(dict(options, algorithm=algorithm, n=n, seed=seed, run=run, warmup=False))
+    return jobs
+
+
+def run_job(job):
+    """Exécute une génération ou une résolution et retourne ses métriques.
+
+    Rien n'est écrit dans les fichiers de métriques ici : les lignes remontent
+    au processus principal, seul écrivain, qui les enregistre par lots.
+    """
+    from maze_generators import GENERATORS, get_generator
+    from maze_profile import attach_profiler
+    from metrics_record import MetricsLogger
+    import mazes_solvers
+    from solver_metric import SolverMetricsLogger
+
+    n, seed, algorithm = job["n"], job["seed"], job["algorithm"]
+    os.makedirs(job["out_dir"], exist_ok=True)
+    suffix = f"_warmup{job['run']}" if job["warmup"] else ""
+    if job["profile"] and job["run"] and not job["warmup"]:
+        suffix = f"_run{job['run']}"  # un profil par répétition
+
+    if algorithm in GENERATORS:
+        logger = MetricsLogger(csv_file=None, trace_allocations=job["trace_allocations"], level=job["metrics_level"])
+        generator = get_generator(algorithm)(n, seed=seed, logger=logger)
+        attach_profiler(job["profile"], logger, generator, "generate")
+        if job.get("analytics"):
+            from maze_analytics import attach_analytics
+            attach_analytics(logger, lambda: generator.grid)
+        generator.generate()
+        filename = os.path.join(job["out_dir"], f"{algorithm}_{n}_{seed}{suffix}.txt")
+        with generator.logger.phase("io"):
+            generator.grid.save(filename)
+        generator.logger.stop(filename)
+        return dict(generator.logger.current_metrics, time_ms=generator.logger.current_metrics["generation_time_ms"])
+
+    # solveur : labyrinthe généré hors mesure, puis résolution mesurée
+    if job["cache_dir"]:
+        from maze_cache import MazeCache
+        maze = MazeCache(job["cache_dir"]).get_or_generate(job["maze_algorithm"], n, seed)
+    else:
+        maze = get_generator(job["maze_algorithm"])(n, seed=seed, csv_file=None).generate()
+    logger = SolverMetricsLogger(csv_file=None, trace_allocations=job["trace_allocations"], level=job["metrics_level"])
+    solver = mazes_solvers.Solver(maze, maze.entrance, maze.exit, logger=logger,
+                                  show_explored=job.get("show_explored", True))
+    attach_profiler(job["profile"], logger, solver, mazes_solvers.SOLVEURS[algorithm])
+    maze_name = f"{job['maze_algorithm']}_{n}_{seed}"
+    logger.start(maze_name=maze_name, maze_size=f"{solver.n}x{solver.m}", algorithm=algorithm)
+    solution, chemin = getattr(solver, mazes_solvers.SOLVEURS[algorithm])()
+    logger.end_timing()
+    filename = os.path.join(job["out_dir"], f"solution_{algorithm}_{maze_name}{suffix}.txt")
+    if solution:
+        with logger.phase("io"):
+            with open(filename, "wb") as f:
+                solution.write(f)
+    logger.stop(filename)
+    return dict(logger.current_metrics, time_ms=logger.current_metrics["solve_time_ms"])
+
+
+def _worker(job, conn):
+    try:
+        conn.send({"status": "ok", "metrics": run_job(job)})
+    except Exception as e:  # remonté au processus principal, la campagne continue
+        conn.send({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_jobs(jobs, workers, timeout=None):
+    """Exécute chaque tâche dans un processus neuf (RSS non partagée entre tâches),
+    au plus `workers` à la fois ; une tâche qui dépasse `timeout` est arrêtée.
+
+    Génère les couples (tâche, résultat) au fil des fins de tâches.
+    """
+    ctx = mp.get_context("spawn")
+    pending = deque(jobs)
+    running = {}  # connexion -> (processus, tâche, échéance)
+
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.popleft()
+            receiver, sender = ctx.Pipe(duplex=False)
+            # non démon : une tâche peut elle-même lancer un pool (ex. tiled_kruskal)
+            process = ctx.Process(target=_worker, args=(job, sender))
+            process.start()
+            sender.close()
+            deadline = time.monotonic() + timeout if timeout else None
+            running[receiver] = (process, job, deadline)
+
+        deadlines = [d for _, _, d in running.values() if d is not None]
+        delay = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        for conn in wait(list(running), timeout=delay):
+            process, job, _ = running.pop(conn)
+            try:
+                result = conn.recv()
+            except EOFError:
+                result = {"status": "crashed", "error": f"code de sortie {process.exitcode}"}
+            conn.close()
+            process.join()
+            yield job, result
+
+        now = time.monotonic()
+        for conn, (process, job, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                process.terminate()
+                process.join()
+                conn.close()
+                del running[conn]
+                yield job, {"status": "timeout", "error": f"plus de {timeout} s"}
+
+
+def percentile(values, q):
+    """Percentile par rang le plus proche (q entre 0 et 100)."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(results):
+    """Médiane et p95 du temps et de la RAM par couple (algorithme, taille)."""
+    groups = {}
+    for job, result in results:
+        if job["warmup"]:
+            continue
+        key = (job["algorithm"], job["n"])
+        group = groups.setdefault(key, {"time": [], "ram": [], "failed": 0})
+        if result["status"] == "ok":
+            group["time"].append(result["metrics"]["time_ms"])
+            group["ram"].append(result["metrics"]["ram_peak_mb"])
+        else:
+            group["failed"] += 1
+
+    rows = []
+    for (algorithm, n), group in sorted(groups.items()):
+        times, ram = group["time"], group["ram"]
+        rows.append({
+            "algorithm": algorithm,
+            "maze_size": n,
+            "runs": len(times),
+            "failed": group["failed"],
+            "time_median_ms": round(statistics.median(times), 2) if times else "",
+            "time_p95_ms": round(percentile(times, 95), 2) if times else "",
+            "ram_median_mb": round(statistics.median(ram), 2) if ram else "",
+            "ram_p95_mb": round(percentile(ram, 95), 2) if ram else "",
+        })
+    return rows
+
+
+def print_summary(rows):
+    columns = ["algorithm", "maze_size", "runs", "failed", "time_median_ms", "time_p95_ms", "ram_median_mb", "ram_p95_mb"]
+    print("\n" + "=" * 136)
+    print("".join(f"{col:>16}" if i else f"{col:<24}" for i, col in enumerate(columns)))
+    print("=" * 136)
+    for row in rows:
+        print("".join(f"{row[col]!s:>16}" if i else f"{row[col]!s:<24}" for i, col in enumerate(columns)))
+    print("=" * 136 + "\n")
+
+
+def main(argv=None):
+    from maze_generators import GENERATORS
+    from mazes_solvers import SOLVEURS
+    from maze_profile import profile_argument
+    from metrics_probe import DEFAULT_LEVEL, METRICS_LEVELS
+    from metrics_record import MetricsLogger
+    from solver_metric import SolverMetricsLogger
+
+    parser = argparse.ArgumentParser(description="Campagne de mesures non interactive (générateurs et solveurs)")
+    parser.add_argument("--algorithms", nargs="+", required=True,
+                        help=f"générateurs ({', '.join(GENERATORS)}) et/ou solveurs ({', '.join(SOLVEURS)})")
+    parser.add_argument("--sizes", nargs="+", type=int, required=True)
+    parser.add_argument("--seeds", nargs="+", default=["1"], help="ex. 1 2 10-20")
+    parser.add_argument("--repeat", type=int, default=1, help="répétitions par (algorithme, taille, graine)")
+    parser.add_argument("--warmup", type=int, default=0, help="exécutions d'échauffement non enregistrées")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=None, help="durée maximale d'une tâche (s)")
+    parser.add_argument("--maze-algorithm", default="kruskal", help="générateur des labyrinthes à résoudre")
+    parser.add_argument("--out-dir", default="batch_grids")
+    parser.add_argument("--cache-dir", default="maze_cache",
+                        help="cache des labyrinthes à résoudre (\"\" pour toujours régénérer)")
+    parser.add_argument("--generator-csv", default=GENERATOR_CSV, help="destination .csv, .parquet ou .duckdb")
+    parser.add_argument("--solver-csv", default=SOLVER_CSV, help="destination .csv, .parquet ou .duckdb")
+    parser.add_argument("--trace-allocations", action="store_true",
+                        help="pic des allocations Python (tracemalloc) ; fausse les temps")
+    parser.add_argument("--metrics-level", default=DEFAULT_LEVEL, choices=METRICS_LEVELS,
+                        help="comptage des événements : off, summary (comptes agrégés) ou detailed")
+    parser.add_argument("--no-explored", action="store_true", help="solutions sans les cases explorées (*)")
+    parser.add_argument("--analytics", action="store_true",
+                        help="analyse de structure des labyrinthes générés (culs-de-sac, diamètre...)")
+    profile_argument(parser)
+    args = parser.parse_args(argv)
+
+    unknown = [a for a in args.algorithms if a not in GENERATORS and a not in SOLVEURS]
+    if unknown:
+        parser.error(f"algorithme(s) inconnu(s) : {', '.join(unknown)}")
+
+    options = {
+        "maze_algorithm": args.maze_algorithm,
+        "out_dir": args.out_dir,
+        "cache_dir": args.cache_dir,
+        "trace_allocations": args.trace_allocations,
+        "metrics_level": args.metrics_level,
+        "profile": args.profile,
+        "show_explored": not args.no_explored,
+        "analytics": args.analytics,
+    }
+    jobs = build_jobs(args.algorithms, args.sizes, parse_seeds(args.seeds), args.repeat, args.warmup, options)
+    # le processus principal est le seul à écrire les métriques, par lots
+    sinks = {
+        "generator": MetricsLogger.open_sink(args.generator_csv),
+        "solver": SolverMetricsLogger.open_sink(args.solver_csv),
+    }
+    print(f"{len(jobs)} tâches sur {args.workers} processus")
+
+    results = []
+    try:
+        for job, result in run_jobs(jobs, args.workers, args.timeout):
+            results.append((job, result))
+            label = f"{job['algorithm']} n={job['n']} seed={job['seed']} run={job['run']}{' (échauffement)' if job['warmup'] else ''}"
+            if result["status"] == "ok":
+                if not job["warmup"]:
+                    sinks["generator" if job["algorithm"] in GENERATORS else "solver"].write(result["metrics"])
+                print(f"[{len(results)}/{len(jobs)}] {label} : {result['metrics']['time_ms']} ms")
+            else:
+                print(f"[{len(results)}/{len(jobs)}] {label} : {result['status']} ({result['error']})")
+    finally:
+        # campagne interrompue : les lignes déjà reçues sont tout de même écrites
+        for sink in sinks.values():
+            sink.flush()
+
+    rows = summarize(results)
+    print_summary(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,202 @@
-import random
 import os
+from array import array
+import numpy as np
 from metrics_record import MetricsLogger
+from maze_cli import script_options
+from maze_profile import attach_profiler
+from maze_grid import MazeGrid, EAST, SOUTH
+
+# Nombre d'arêtes converties en entiers Python à la fois pour l'union-find
+EDGE_CHUNK = 1 << 16
 
 class UnionFind:
+    """Union-find sur tableaux array('i') : union par taille, compression par moitié.
+
+    Les opérations sont comptées localement dans self.operations et ne sont
+    transmises au MetricsLogger qu'à l'appel de flush_metrics(). Sauf logger
+    au niveau "detailed", union_pairs ne compte pas les niveaux parcourus par
+    find : deux find et une éventuelle union par paire (compte analytique).
+    """
+
     def __init__(self, n, metrics_logger=None):
-        self.parent = list(range(n))
-        self.rank = [0] * n
+        self.parent = array('i', range(n))
+        self.size = array('i', [1]) * n
         self.components = n
         self.metrics_logger = metrics_logger
+        self.detailed = metrics_logger is not None and metrics_logger.detailed
+        self.operations = 0
+        self._flushed = 0
 
     def find(self, x):
-        if self.parent[x] != x:
-            self.parent[x] = self.find(self.parent[x])
-        if self.metrics_logger:
-            self.metrics_logger.increment_union_find_op()
-        return self.parent[x]
+        parent = self.parent
+        ops = 1
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+            ops += 1
+        self.operations += ops
+        return x
 
     def union(self, x, y):
         root_x = self.find(x)
         root_y = self.find(y)
         if root_x == root_y:
             return False
-        if self.rank[root_x] < self.rank[root_y]:
-            self.parent[root_x] = root_y
-        elif self.rank[root_x] > self.rank[root_y]:
-            self.parent[root_y] = root_x
-        else:
-            self.parent[root_y] = root_x
-            self.rank[root_x] += 1
+        if self.size[root_x] < self.size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        self.size[root_x] += self.size[root_y]
         self.components -= 1
-        if self.metrics_logger:
-            self.metrics_logger.increment_union_find_op()
+        self.operations += 1
         return True
 
     def same_set(self, x, y):
         return self.find(x) == self.find(y)
 
+    def union_pairs(self, us, vs):
+        """Applique union(u, v) à chaque paire, avec find en ligne (sans appel de méthode).
+
+        S'arrête dès qu'il ne reste qu'une composante et retourne les positions
+        des paires qui ont réuni deux composantes.
+        """
+        if not self.detailed:
+            return self._union_pairs_uncounted(us, vs)
+        parent = self.parent
+        size = self.size
+        components = self.components
+        ops = 0
+        kept = []
+        for i, (x, y) in enumerate(zip(us, vs)):
+            ops += 2
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+                ops += 1
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+                ops += 1
+            if x == y:
+                continue
+            if size[x] < size[y]:
+                x, y = y, x
+            parent[y] = x
+            size[x] += size[y]
+            ops += 1
+            kept.append(i)
+            components -= 1
+            if components == 1:
+                break
+        self.components = components
+        self.operations += ops
+        return kept
+
+    def _union_pairs_uncounted(self, us, vs):
+        """union_pairs sans compteur dans les boucles de find."""
+        parent = self.parent
+        size = self.size
+        components = self.components
+        kept = []
+        i = -1
+        for i, (x, y) in enumerate(zip(us, vs)):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+            if x == y:
+                continue
+            if size[x] < size[y]:
+                x, y = y, x
+            parent[y] = x
+            size[x] += size[y]
+            kept.append(i)
+            components -= 1
+            if components == 1:
+                break
+        self.components = components
+        self.operations += 2 * (i + 1) + len(kept)
+        return kept
+
+    def flush_metrics(self):
+        """Transmet au logger les opérations comptées depuis le dernier flush."""
+        if self.metrics_logger and self.metrics_logger.counting:
+            self.metrics_logger.increment_union_find_op(self.operations - self._flushed)
+        self._flushed = self.operations
+
 class MazeGenerator:
-    def __init__(self, n):
+    def __init__(self, n, metrics_logger=None):
         self.n = n
         self.V = n * n
         self.maze_grid = None
-        self.metrics_logger = MetricsLogger(csv_file=r"C:\Users\Windows\Desktop\projets\2a\amazing-mazes\constructors_metrics.csv")
+        if metrics_logger is None:
+            metrics_logger = MetricsLogger(csv_file=r"C:\Users\Windows\Desktop\projets\2a\amazing-mazes\constructors_metrics.csv")
+        self.metrics_logger = metrics_logger
 
     def cell_to_index(self, row, col):
         return row * self.n + col
 
+    def build_edges(self):
+        """Arêtes du graphe grille, codées cellule * 2 + direction (0 = est, 1 = sud)."""
+        cells = np.arange(self.V, dtype=np.int32).reshape(self.n, self.n)
+        east = cells[:, :-1].ravel() * 2
+        south = cells[:-1, :].ravel() * 2 + 1
+        return np.concatenate([east, south])
+
     def kruskal_maze_canonical(self, seed=None):
-        self.metrics_logger.start(self.n, "kruskal", seed)
-        if seed is not None:
-            random.seed(seed)
-        uf = UnionFind(self.V, self.metrics_logger)
-        selected_walls = []
-        edges_added = 0
-        edges = []
-        for row in range(self.n):
-            for col in range(self.n):
-                u = self.cell_to_index(row, col)
-                if col < self.n - 1:
-                    v = self.cell_to_index(row, col + 1)
-                    edges.append((u, v))
-                    self.metrics_logger.increment_edge()
-                if row < self.n - 1:
-                    v = self.cell_to_index(row + 1, col)
-                    edges.append((u, v))
-                    self.metrics_logger.increment_edge()
-        random.shuffle(edges)
-        for u, v in edges:
-            if uf.union(u, v):
-                selected_walls.append([u, v])
-                edges_added += 1
-                if edges_added == self.V - 1:
+        logger = self.metrics_logger
+        logger.start(self.n, "kruskal", seed)
+        rng = np.random.default_rng(seed)
+
+        # Construction et mélange des 2·n·(n−1) arêtes en un bloc
+        with logger.phase("edges"):
+            edges = self.build_edges()
+        logger.increment_edge(len(edges))
+        with logger.phase("shuffle"):
+            rng.shuffle(edges)
+
+        # Seule partie arête par arête : l'union-find, traité par tranches pour
+        # ne jamais convertir toutes les arêtes en entiers Python
+        with logger.phase("union_find"):
+            uf = UnionFind(self.V, logger)
+            n = self.n
+            selected = []
+            for start in range(0, len(edges), EDGE_CHUNK):
+                if uf.components == 1:
                     break
-        self.create_maze_grid(selected_walls)
-        return selected_walls
+                chunk = edges[start:start + EDGE_CHUNK]
+                u = chunk >> 1
+                v = u + np.where(chunk & 1, n, 1).astype(np.int32)
+                kept = uf.union_pairs(u.tolist(), v.tolist())
+                selected.append(chunk[kept])
+            uf.flush_metrics()
+
+        with logger.phase("carve"):
+            selected = np.concatenate(selected) if selected else np.empty(0, dtype=np.int32)
+            self._carve_edges(selected)
+            u = (selected >> 1).astype(np.int64)
+            pairs = np.stack([u, u + np.where(selected & 1, n, 1)], axis=1)
+        logger.end_timing()
+        return pairs
 
     def create_maze_grid(self, selected_edges):
-        self.maze_grid = [['#' for _ in range(2*self.n+1)] for _ in range(2*self.n+1)]
-        for row in range(1, 2*self.n, 2):
-            for col in range(1, 2*self.n, 2):
-                self.maze_grid[row][col] = '.'
-        self.maze_grid[0][1] = '.'
-        self.maze_grid[2*self.n][2*self.n-1] = '.'
-        for u, v in selected_edges:
-            u_row, u_col = u // self.n, u % self.n
-            v_row, v_col = v // self.n, v % self.n
-            u_display_row, u_display_col = 2*u_row + 1, 2*u_col + 1
-            v_display_row, v_display_col = 2*v_row + 1, 2*v_col + 1
-            wall_row = (u_display_row + v_display_row) // 2
-            wall_col = (u_display_col + v_display_col) // 2
-            self.maze_grid[wall_row][wall_col] = '.'
+        """Construit la grille à partir d'une liste d'arêtes (u, v)."""
+        edges = np.asarray(selected_edges, dtype=np.int64).reshape(-1, 2)
+        u = edges.min(axis=1)
+        self._carve_edges(u * 2 + (edges.max(axis=1) - u != 1))
+
+    def _carve_edges(self, codes):
+        """Casse en une seule opération les murs des arêtes codées (cf. build_edges)."""
+        self.maze_grid = MazeGrid(self.n)
+        walls = self.maze_grid.walls.reshape(-1)
+        south = (codes & 1).astype(bool)
+        walls[codes[~south] >> 1] &= ~EAST & 0xFF
+        walls[codes[south] >> 1] &= ~SOUTH & 0xFF
 
     def save_to_file(self, filename):
-        with open(filename, 'w') as f:
-            for row in self.maze_grid:
-                f.write(''.join(row) + '\n')
+        with self.metrics_logger.phase("io"):
+            self.maze_grid.save(filename)
         print(f"Labyrinthe sauvegardé dans {filename}")
         self.metrics_logger.stop(filename)
         self.metrics_logger.print_metrics()
@@ -109,14 +211,16 @@ class MazeGenerator:
         print("\n" + "="*50)
         print("LABYRINTHE GÉNÉRÉ")
         print("="*50)
-        for row in self.maze_grid:
-            print(''.join(row))
+        for line in self.maze_grid.iter_lines():
+            print(line)
         print("="*50 + "\n")
 
 if __name__ == "__main__":
     n = int(input("Quelle taille de labyrinthe ?: "))
     seed_input = input("Seed ? : ").strip()
     generator = MazeGenerator(n)
+    # --profile [sample|cprofile] : profil écrit à côté du labyrinthe
+    attach_profiler(script_options().profile, generator.metrics_logger, generator, "kruskal_maze_canonical")
     if seed_input:
         generator.kruskal_maze_canonical(seed=int(seed_input))
     else:
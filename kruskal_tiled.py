@@ -0,0 +1,168 @@
+import argparse
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from kruskal_strict import EDGE_CHUNK, UnionFind
+from maze_grid import MazeGrid, EAST, SOUTH
+from metrics_record import MetricsLogger
+
+# Nombre de tuiles par côté par défaut (DEFAULT_TILES² tuiles)
+DEFAULT_TILES = 4
+
+
+def tile_bounds(n, tiles):
+    """Bornes [b[k], b[k+1]) des tuiles le long d'un côté de n cellules."""
+    return [n * k // tiles for k in range(tiles + 1)]
+
+
+def kruskal_rect(h, w, rng):
+    """Kruskal sur une grille h x w : arêtes retenues (codes cellule * 2 + direction,
+    indices locaux) et nombre d'opérations union-find."""
+    cells = np.arange(h * w, dtype=np.int32).reshape(h, w)
+    edges = np.concatenate([cells[:, :-1].ravel() * 2, cells[:-1, :].ravel() * 2 + 1])
+    rng.shuffle(edges)
+    uf = UnionFind(h * w)
+    selected = []
+    for start in range(0, len(edges), EDGE_CHUNK):
+        if uf.components == 1:
+            break
+        chunk = edges[start:start + EDGE_CHUNK]
+        u = chunk >> 1
+        v = u + np.where(chunk & 1, w, 1).astype(np.int32)
+        selected.append(chunk[uf.union_pairs(u.tolist(), v.tolist())])
+    selected = np.concatenate(selected) if selected else np.empty(0, dtype=np.int32)
+    return selected, uf.operations, len(edges)
+
+
+def _carve_tile(task):
+    """Génère une tuile dans la grille partagée ; exécuté dans un processus du pool.
+
+    Chaque tuile n'écrit que les murs de ses propres cellules, et seulement
+    entre cellules de la tuile : les processus n'écrivent jamais le même octet.
+    """
+    shm_name, n, r0, r1, c0, c1, seed_seq = task
+    start = time.perf_counter()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        walls = np.ndarray((n, n), dtype=np.uint8, buffer=shm.buf)
+        h, w = r1 - r0, c1 - c0
+        codes, ops, edges = kruskal_rect(h, w, np.random.default_rng(seed_seq))
+        block = walls[r0:r1, c0:c1]
+        rows, cols = np.divmod(codes >> 1, w)
+        south = (codes & 1).astype(bool)
+        block[rows[~south], cols[~south]] &= ~EAST & 0xFF
+        block[rows[south], cols[south]] &= ~SOUTH & 0xFF
+        del walls, block
+    finally:
+        shm.close()
+    return (time.perf_counter() - start) * 1000, ops, edges
+
+
+class TiledMazeGenerator:
+    """Kruskal par tuiles : chaque tuile est un arbre couvrant indépendant, généré
+    dans un pool de processus directement dans une grille en mémoire partagée,
+    puis les tuiles sont reliées par un Kruskal sur les seules arêtes de bord.
+
+    Le résultat est un labyrinthe parfait (arbre couvrant de tuiles reliant des
+    arbres couvrants), déterminé par la graine et le nombre de tuiles, quel que
+    soit le nombre de processus.
+    """
+
+    def __init__(self, n, tiles=DEFAULT_TILES, workers=None, metrics_logger=None):
+        self.n = n
+        self.tiles = max(1, min(tiles, n))
+        self.workers = workers or os.cpu_count() or 1
+        self.maze_grid = None
+        if metrics_logger is None:
+            metrics_logger = MetricsLogger(csv_file="constructors_metrics.csv")
+        self.metrics_logger = metrics_logger
+
+    def generate(self, seed=None):
+        logger = self.metrics_logger
+        n, tiles = self.n, self.tiles
+        logger.start(n, "tiled_kruskal", seed)
+        bounds = tile_bounds(n, tiles)
+        # une graine par tuile + une pour l'assemblage, dérivées de la graine principale
+        seeds = np.random.SeedSequence(seed).spawn(tiles * tiles + 1)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(n * n, 1))
+        try:
+            walls = np.ndarray((n, n), dtype=np.uint8, buffer=shm.buf)
+            walls[:] = EAST | SOUTH
+            tasks = [
+                (shm.name, n, bounds[i], bounds[i + 1], bounds[j], bounds[j + 1], seeds[i * tiles + j])
+                for i in range(tiles) for j in range(tiles)
+            ]
+            with logger.phase("carve"):
+                if self.workers == 1 or len(tasks) == 1:
+                    results = [_carve_tile(task) for task in tasks]
+                else:
+                    with mp.get_context("spawn").Pool(min(self.workers, len(tasks))) as pool:
+                        results = pool.map(_carve_tile, tasks)
+            grid = MazeGrid(n, walls.copy())
+            del walls
+        finally:
+            shm.close()
+            shm.unlink()
+
+        with logger.phase("union_find"):
+            stitched, stitch_ops, boundary = self._stitch(grid, bounds, np.random.default_rng(seeds[-1]))
+        self.maze_grid = grid
+
+        times = [ms for ms, _, _ in results]
+        logger.record_tiles(times)
+        if logger.counting:
+            logger.increment_edge(sum(edges for _, _, edges in results) + boundary)
+            logger.increment_union_find_op(sum(ops for _, ops, _ in results) + stitch_ops)
+        logger.end_timing()
+        return grid
+
+    def _stitch(self, grid, bounds, rng):
+        """Relie les tuiles : Kruskal sur les arêtes entre tuiles voisines, l'union-find
+        ne portant que sur les tuiles (chacune est déjà connexe)."""
+        n, tiles = self.n, self.tiles
+        cuts = np.array(bounds[1:-1], dtype=np.int64)
+        rows = np.arange(n, dtype=np.int64)
+        # arêtes est traversant une coupe verticale, arêtes sud traversant une coupe horizontale
+        east = ((rows[:, None] * n + cuts[None, :] - 1) * 2).ravel()
+        south = (((cuts[:, None] - 1) * n + rows[None, :]) * 2 + 1).ravel()
+        edges = np.concatenate([east, south])
+        rng.shuffle(edges)
+
+        cell = edges >> 1
+        r, c = np.divmod(cell, n)
+        tile_of = np.searchsorted(np.array(bounds[1:]), np.arange(n), side="right")
+        u = tile_of[r] * tiles + tile_of[c]
+        v = np.where(edges & 1, u + tiles, u + 1)
+        uf = UnionFind(tiles * tiles)
+        kept = edges[uf.union_pairs(u.tolist(), v.tolist())]
+
+        flat = grid.walls.reshape(-1)
+        south_kept = (kept & 1).astype(bool)
+        flat[kept[~south_kept] >> 1] &= ~EAST & 0xFF
+        flat[kept[south_kept] >> 1] &= ~SOUTH & 0xFF
+        return kept, uf.operations, len(edges)
+
+    def save_to_file(self, filename):
+        with self.metrics_logger.phase("io"):
+            self.maze_grid.save(filename)
+        print(f"Labyrinthe sauvegardé dans {filename}")
+        self.metrics_logger.stop(filename)
+        self.metrics_logger.print_metrics()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kruskal par tuiles sur plusieurs processus")
+    parser.add_argument("n", type=int, help="taille du labyrinthe (n x n cellules)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tiles", type=int, default=DEFAULT_TILES, help="tuiles par côté")
+    parser.add_argument("--workers", type=int, default=None, help="processus (défaut : nombre de cœurs)")
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    generator = TiledMazeGenerator(args.n, tiles=args.tiles, workers=args.workers)
+    generator.generate(seed=args.seed)
+    seed_str = args.seed if args.seed is not None else "random"
+    generator.save_to_file(args.output or f"tiled_kruskal_{args.n}_{args.tiles}_{seed_str}.txt")
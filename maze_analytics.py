@@ -0,0 +1,149 @@
+import argparse
+import os
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order
+from maze_grid import MazeGrid, EAST, SOUTH
+
+# Analyse de structure d'un labyrinthe, sur le graphe des cellules (murs n x n) :
+# champ de distances depuis l'entrée, culs-de-sac, histogramme des degrés,
+# diamètre (deux parcours en largeur, exact pour un labyrinthe parfait) et
+# tortuosité de la solution. Les parcours en largeur sont ceux de
+# scipy.sparse.csgraph (C), les distances sont déduites de leur ordre de visite.
+
+
+def passages(walls):
+    """Masques (n x n) des passages vers l'est, le sud, l'ouest et le nord de chaque cellule."""
+    east = (walls & EAST) == 0
+    south = (walls & SOUTH) == 0
+    east[:, -1] = False  # bord extérieur
+    south[-1, :] = False
+    west = np.zeros_like(east)
+    west[:, 1:] = east[:, :-1]  # passage ouest = passage est du voisin
+    north = np.zeros_like(south)
+    north[1:, :] = south[:-1, :]
+    return east, south, west, north
+
+
+def cell_graph(masks):
+    """Graphe des cellules en CSR symétrique, construit directement (sans tri ni transposée)."""
+    n = masks[0].shape[0]
+    degree = sum(mask.ravel().astype(np.int32) for mask in masks)
+    indptr = np.zeros(n * n + 1, dtype=np.int32)
+    np.cumsum(degree, out=indptr[1:])
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    slot = indptr[:-1].copy()
+    for mask, offset in zip(masks, (1, n, -1, -n)):
+        cells = np.flatnonzero(mask).astype(np.int32)
+        indices[slot[cells]] = cells + offset
+        slot[cells] += 1
+    return csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n * n, n * n))
+
+
+def distance_field(graph, source):
+    """Distances (en pas) de chaque cellule à `source`, -1 si non atteinte.
+
+    Dans l'ordre du parcours en largeur, la position du prédécesseur ne
+    décroît jamais : chaque niveau se termine là où commencent les cellules
+    dont le prédécesseur est au-delà du niveau précédent (une recherche
+    dichotomique par niveau, pas une boucle par cellule).
+    """
+    order, predecessors = breadth_first_order(graph, source, directed=True, return_predecessors=True)
+    position = np.empty(graph.shape[0], dtype=np.int64)
+    position[order] = np.arange(len(order))
+    parent_position = position[predecessors[order[1:]]]
+    bounds = [0, 1]
+    while bounds[-1] < len(order):
+        bounds.append(1 + int(np.searchsorted(parent_position, bounds[-1])))
+    distance = np.full(graph.shape[0], -1, dtype=np.int32)
+    distance[order] = np.repeat(np.arange(len(bounds) - 1, dtype=np.int32), np.diff(bounds))
+    return distance
+
+
+def _cell(display, n):
+    """Cellule (indice à plat) d'une ouverture du bord (coordonnées de la grille texte)."""
+    x, y = display
+    row = min(max((x - 1) // 2, 0), n - 1)
+    col = min(max((y - 1) // 2, 0), n - 1)
+    return row * n + col
+
+
+def analyze(grid):
+    """Toutes les mesures d'un labyrinthe (MazeGrid ou PackedMaze) en un passage.
+
+    Retourne un dictionnaire : colonnes de métriques (cf. MetricsLogger) et
+    champ de distances depuis l'entrée ("distance", tableau n x n).
+    """
+    start = time.perf_counter()
+    n = grid.n
+    walls = grid.walls if hasattr(grid, "walls") else grid.walls_rows(0, n)
+    entrance = _cell(grid.entrance, n)
+    exit_cell = _cell(grid.exit, n)
+
+    masks = passages(walls)
+    degree = sum(mask.astype(np.int8) for mask in masks)
+    histogram = np.bincount(degree.ravel(), minlength=5)
+    graph = cell_graph(masks)
+
+    distance = distance_field(graph, entrance)
+    reached = distance >= 0
+    # diamètre : la cellule la plus éloignée de l'entrée est une extrémité d'un plus long chemin
+    farthest = int(np.argmax(distance))
+    diameter = int(distance_field(graph, farthest).max())
+
+    solution_length = int(distance[exit_cell])  # en pas ; -1 si la sortie n'est pas reliée
+    straight = abs(exit_cell // n - entrance // n) + abs(exit_cell % n - entrance % n)
+    return {
+        "distance": distance.reshape(n, n),
+        "dead_ends": int(histogram[1]),
+        "corridor_cells": int(histogram[2]),
+        "junctions_3": int(histogram[3]),
+        "junctions_4": int(histogram[4]),
+        "max_distance": int(distance.max()),
+        "mean_distance": round(float(distance[reached].mean()), 2),
+        "diameter": diameter,
+        "solution_length": solution_length,
+        "tortuosity": round(solution_length / straight, 3) if straight and solution_length >= 0 else "",
+        "analytics_time_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def analytics_columns(grid):
+    """Colonnes de métriques de analyze(grid), sans le champ de distances."""
+    result = analyze(grid)
+    del result["distance"]
+    return result
+
+
+def attach_analytics(logger, get_grid):
+    """Ajoute les colonnes d'analyse à la ligne de métriques, calculées à logger.stop()
+    (après les mesures de temps et de mémoire) sur le labyrinthe retourné par get_grid()."""
+    logger.analytics = lambda: analytics_columns(get_grid())
+
+
+def load_maze(spec):
+    """Labyrinthe depuis un .maze, un .txt ou "algorithme:taille:graine" (cache)."""
+    if not os.path.exists(spec) and spec.count(":") == 2:
+        from maze_cache import MazeCache
+        algorithm, n, seed = spec.split(":")
+        return MazeCache().get_or_generate(algorithm, int(n), int(seed))
+    if spec.endswith(".maze"):
+        from maze_format import load_packed
+        return load_packed(spec)
+    return MazeGrid.load(spec)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyse de structure d'un labyrinthe")
+    parser.add_argument("maze", help="fichier .maze / .txt ou algorithme:taille:graine")
+    parser.add_argument("--field", default=None, help="enregistre le champ de distances (.npy)")
+    args = parser.parse_args()
+
+    result = analyze(load_maze(args.maze))
+    distance = result.pop("distance")
+    if args.field:
+        np.save(args.field, distance)
+        print(f"Champ de distances enregistré dans {args.field}")
+    for name, value in result.items():
+        print(f"{name:>18}: {value}")
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+import numpy as np
+from batch_runner import build_jobs, parse_seeds, run_jobs
+
+# Suite de passage à l'échelle : chaque générateur et solveur sur une échelle
+# géométrique de tailles, exposants de complexité ajustés en log-log, puis
+# comparaison avec une référence (JSON) enregistrée par --update-baseline.
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.25  # dégradation relative tolérée (temps et mémoire)
+DEFAULT_EXPONENT_TOLERANCE = 0.2  # hausse tolérée des exposants de complexité
+MIN_TIME_MS = 20.0  # temps en dessous desquels la comparaison n'est que du bruit ...
+MIN_TIME_DELTA_MS = 10.0  # ... sauf si l'écart absolu dépasse celui-ci (5 ms -> 19 ms)
+MIN_RAM_MB = 1.0  # idem pour la mémoire au-dessus de l'empreinte de l'interpréteur
+
+
+def size_ladder(min_size, max_size, factor=2.0):
+    """Tailles géométriques min_size, min_size * factor, ... jusqu'à max_size compris."""
+    sizes, n = [], float(min_size)
+    while round(n) <= max_size:
+        if not sizes or round(n) != sizes[-1]:
+            sizes.append(int(round(n)))
+        n *= factor
+    return sizes
+
+
+def fit_exponent(sizes, values, minimum=0.0):
+    """Exposant k de values ~ c * cellules^k (cellules = n²), par moindres carrés en log-log.
+
+    Les valeurs inférieures à `minimum` (bruit de mesure) sont ignorées ;
+    None s'il reste moins de deux points.
+    """
+    points = [(n * n, v) for n, v in zip(sizes, values) if v and v > 0 and v >= minimum]
+    if len(points) < 2:
+        return None
+    x = np.log([cells for cells, _ in points])
+    y = np.log([v for _, v in points])
+    slope, _ = np.polyfit(x, y, 1)
+    return round(float(slope), 3)
+
+
+def build_report(results):
+    """Résultats par algorithme : temps, débit, mémoire par taille, exposants ajustés.
+
+    Le temps retenu est le meilleur des répétitions (le bruit d'une machine
+    partagée ne fait que ralentir) ; la mémoire est la médiane du pic de RSS,
+    au-dessus de celui de la plus petite taille (empreinte de l'interpréteur
+    et des imports retirée).
+    """
+    groups = {}
+    for job, result in results:
+        if not job["warmup"] and result["status"] == "ok":
+            group = groups.setdefault(job["algorithm"], {}).setdefault(job["n"], {"time": [], "ram": []})
+            group["time"].append(result["metrics"]["time_ms"])
+            group["ram"].append(result["metrics"]["ram_peak_mb"])
+
+    report = {}
+    for algorithm, by_size in sorted(groups.items()):
+        ns = sorted(by_size)
+        floor = statistics.median(by_size[ns[0]]["ram"])
+        sizes = {}
+        for n in ns:
+            time_ms = min(by_size[n]["time"])
+            ram = statistics.median(by_size[n]["ram"])
+            sizes[str(n)] = {
+                "time_ms": time_ms,
+                "cells_per_s": round(n * n / (time_ms / 1000), 1) if time_ms else None,
+                "ram_mb": round(ram, 2),
+                "ram_extra_mb": round(ram - floor, 2),
+                "runs": len(by_size[n]["time"]),
+            }
+        report[algorithm] = {
+            "sizes": sizes,
+            "time_exponent": fit_exponent(ns, [s["time_ms"] for s in sizes.values()], MIN_TIME_MS),
+            "memory_exponent": fit_exponent(ns, [s["ram_extra_mb"] for s in sizes.values()], MIN_RAM_MB),
+        }
+    return report
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD, exponent_tolerance=DEFAULT_EXPONENT_TOLERANCE):
+    """Liste des régressions de `report` par rapport à `baseline` (chaînes lisibles)."""
+    regressions = []
+    for algorithm, current in report.items():
+        reference = baseline.get(algorithm)
+        if reference is None:
+            continue
+        for n, now in current["sizes"].items():
+            ref = reference["sizes"].get(n)
+            if ref is None:
+                continue
+            significant = (max(ref["time_ms"], now["time_ms"]) >= MIN_TIME_MS
+                           or now["time_ms"] - ref["time_ms"] >= MIN_TIME_DELTA_MS)
+            if significant and now["time_ms"] > ref["time_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{algorithm} n={n} : débit {now['cells_per_s']:.0f} cellules/s contre {ref['cells_per_s']:.0f} "
+                    f"({now['time_ms']} ms contre {ref['time_ms']} ms, +{now['time_ms'] / ref['time_ms'] - 1:.0%})")
+            ref_ram = max(ref["ram_extra_mb"], MIN_RAM_MB)
+            if now["ram_extra_mb"] > ref_ram * (1 + threshold) and now["ram_extra_mb"] - ref["ram_extra_mb"] >= MIN_RAM_MB:
+                regressions.append(
+                    f"{algorithm} n={n} : mémoire +{now['ram_extra_mb']} Mo contre +{ref['ram_extra_mb']} Mo")
+        for key, label in (("time_exponent", "temps"), ("memory_exponent", "mémoire")):
+            now, ref = current[key], reference.get(key)
+            if now is not None and ref is not None and now > ref + exponent_tolerance:
+                regressions.append(f"{algorithm} : exposant {label} {now} contre {ref} (cellules^k)")
+    return regressions
+
+
+def unfitted_exponents(report):
+    """Avertissements pour les exposants non ajustés (moins de deux tailles au-dessus du bruit) :
+    ces algorithmes échappent au contrôle des exposants."""
+    warnings = []
+    for algorithm, result in report.items():
+        for key, label, minimum in (("time_exponent", "temps", f"{MIN_TIME_MS:g} ms"),
+                                    ("memory_exponent", "mémoire", f"{MIN_RAM_MB:g} Mo")):
+            if result[key] is None:
+                warnings.append(f"{algorithm} : exposant {label} non ajusté (moins de deux tailles au-dessus de "
+                                f"{minimum}), augmenter --max-size")
+    return warnings
+
+
+def print_report(report, baseline=None):
+    print("\n" + "=" * 96)
+    print(f"{'algorithm':<24}{'time_exp':>10}{'mem_exp':>10}{'base_time_exp':>15}   time_ms par taille")
+    print("=" * 96)
+    for algorithm, result in report.items():
+        ref = (baseline or {}).get(algorithm, {})
+        times = "  ".join(f"{n}:{s['time_ms']}" for n, s in result["sizes"].items())
+        print(f"{algorithm:<24}{result['time_exponent']!s:>10}{result['memory_exponent']!s:>10}"
+              f"{ref.get('time_exponent', '')!s:>15}   {times}")
+    print("=" * 96 + "\n")
+
+
+def main(argv=None):
+    from maze_generators import GENERATORS
+    from mazes_solvers import SOLVEURS
+
+    parser = argparse.ArgumentParser(description="Passage à l'échelle et détection des régressions")
+    parser.add_argument("--algorithms", nargs="+", default=list(GENERATORS) + list(SOLVEURS),
+                        help="générateurs et/ou solveurs (défaut : tous)")
+    parser.add_argument("--min-size", type=int, default=32)
+    parser.add_argument("--max-size", type=int, default=512)
+    parser.add_argument("--factor", type=float, default=2.0, help="raison de l'échelle géométrique des tailles")
+    parser.add_argument("--seeds", nargs="+", default=["1"], help="ex. 1 2 10-20")
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions par (algorithme, taille, graine)")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="processus simultanés (1 : temps les plus stables)")
+    parser.add_argument("--timeout", type=float, default=None, help="durée maximale d'une tâche (s)")
+    parser.add_argument("--maze-algorithm", default="kruskal", help="générateur des labyrinthes à résoudre")
+    parser.add_argument("--cache-dir", default="maze_cache")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="référence JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="enregistre ce passage comme référence")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="dégradation relative tolérée du temps et de la mémoire (0.25 = 25 %%)")
+    parser.add_argument("--exponent-tolerance", type=float, default=DEFAULT_EXPONENT_TOLERANCE)
+    parser.add_argument("--report", default=None, help="écrit aussi le rapport JSON de ce passage")
+    args = parser.parse_args(argv)
+
+    unknown = [a for a in args.algorithms if a not in GENERATORS and a not in SOLVEURS]
+    if unknown:
+        parser.error(f"algorithme(s) inconnu(s) : {', '.join(unknown)}")
+
+    sizes = size_ladder(args.min_size, args.max_size, args.factor)
+    with tempfile.TemporaryDirectory(prefix="maze_bench_") as out_dir:
+        options = {
+            "maze_algorithm": args.maze_algorithm,
+            "out_dir": out_dir,
+            "cache_dir": args.cache_dir,
+            "trace_allocations": False,
+            "metrics_level": "summary",
+            "profile": None,
+        }
+        jobs = build_jobs(args.algorithms, sizes, parse_seeds(args.seeds), args.repeat, args.warmup, options)
+        print(f"{len(jobs)} tâches, tailles {sizes}")
+        results = []
+        for job, result in run_jobs(jobs, args.workers, args.timeout):
+            results.append((job, result))
+            if result["status"] != "ok":
+                print(f"{job['algorithm']} n={job['n']} seed={job['seed']} : {result['status']} ({result['error']})")
+
+    report = build_report(results)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_report(report, baseline)
+    for line in unfitted_exponents(report):
+        print(f"AVERTISSEMENT : {line}")
+
+    document = {
+        "meta": {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "sizes": sizes, "seeds": args.seeds, "repeat": args.repeat,
+            "maze_algorithm": args.maze_algorithm,
+            "python": sys.version.split()[0], "cpu_count": os.cpu_count(),
+        },
+        "results": report,
+    }
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    failed = sum(1 for _, result in results if result["status"] != "ok")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 1 if failed else 0
+    if baseline is None:
+        print(f"Aucune référence ({args.baseline}) : relancer avec --update-baseline pour l'enregistrer")
+        return 1 if failed else 0
+
+    regressions = compare(report, baseline, args.threshold, args.exponent_tolerance)
+    if failed:
+        regressions.append(f"{failed} tâche(s) en échec")
+    if regressions:
+        print(f"RÉGRESSIONS (seuil {args.threshold:.0%}, tolérance d'exposant {args.exponent_tolerance}) :")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    print("Aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
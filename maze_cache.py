@@ -0,0 +1,178 @@
+import argparse
+import hashlib
+import os
+from collections import OrderedDict
+from maze_format import PackedMaze, load_packed, pack_walls, save_packed
+from maze_generators import get_generator
+
+# Cache des labyrinthes générés : la génération est déterministe pour
+# (algorithme, n, graine, version du générateur), le labyrinthe compact
+# (.maze, 2 bits par cellule) est donc conservé et réutilisé.
+DEFAULT_CACHE_DIR = "maze_cache"
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024  # octets de murs compactés gardés en mémoire
+DEFAULT_DISK_BUDGET = 4 * 1024 * 1024 * 1024  # octets de fichiers .maze sur disque
+
+
+def cache_key(algorithm, n, seed):
+    """Empreinte SHA-256 de (algorithme, n, graine, version du générateur)."""
+    version = get_generator(algorithm).version
+    return hashlib.sha256(f"{algorithm}:{n}:{seed}:{version}".encode("utf-8")).hexdigest()
+
+
+class MazeCache:
+    """Cache à deux niveaux : LRU en mémoire puis fichiers .maze sur disque.
+
+    Chaque niveau a son budget en octets ; au-delà, les labyrinthes les moins
+    récemment utilisés sont évincés (dernier accès = mtime pour le disque).
+    Les fichiers sont écrits sous un nom temporaire puis renommés : plusieurs
+    processus peuvent partager le même répertoire. Les labyrinthes sans graine
+    ne sont pas reproductibles et ne sont jamais mis en cache. Sans répertoire
+    (cache_dir vide), seul le niveau mémoire est utilisé.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, memory_budget=DEFAULT_MEMORY_BUDGET, disk_budget=DEFAULT_DISK_BUDGET):
+        self.cache_dir = cache_dir
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self._memory = OrderedDict()  # clé -> PackedMaze, du moins au plus récent
+        self._memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".maze")
+
+    def get(self, algorithm, n, seed):
+        """Labyrinthe en cache (PackedMaze) ou None."""
+        if seed is None:
+            return None
+        key = cache_key(algorithm, n, seed)
+        maze = self._memory.get(key)
+        if maze is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return maze
+        if not self.cache_dir:
+            return None
+
+        path = self.path(key)
+        try:
+            maze = load_packed(path, mmap=False)
+            os.utime(path)  # plus récemment utilisé
+        except (OSError, ValueError):
+            return None
+        self.disk_hits += 1
+        self._remember(key, maze)
+        return maze
+
+    def put(self, algorithm, n, seed, maze):
+        """Met en cache un MazeGrid (ou PackedMaze) et retourne sa version compacte."""
+        if not isinstance(maze, PackedMaze):
+            maze = PackedMaze(maze.n, pack_walls(maze.walls), seed=seed, algorithm=algorithm,
+                              entrance=maze.entrance, exit=maze.exit)
+        if seed is None:
+            return maze
+        key = cache_key(algorithm, n, seed)
+        self._remember(key, maze)
+        if self.cache_dir and self.disk_budget > 0:
+            path = self.path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            save_packed(maze, tmp_path, seed=seed, algorithm=algorithm)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        return maze
+
+    def get_or_generate(self, algorithm, n, seed):
+        """Labyrinthe compact pour (algorithme, n, graine), généré seulement en cas d'absence."""
+        maze = self.get(algorithm, n, seed)
+        if maze is not None:
+            return maze
+        self.misses += 1
+        grid = get_generator(algorithm)(n, seed=seed, csv_file=None).generate()
+        return self.put(algorithm, n, seed, grid)
+
+    def _remember(self, key, maze):
+        if maze.nbytes > self.memory_budget:
+            return
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key).nbytes
+        self._memory[key] = maze
+        self._memory_bytes += maze.nbytes
+        while self._memory_bytes > self.memory_budget:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.nbytes
+
+    def _disk_entries(self):
+        """(mtime, taille, chemin) de chaque fichier .maze du cache."""
+        entries = []
+        if not self.cache_dir:
+            return entries
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".maze"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue  # supprimé entre-temps par un autre processus
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self):
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def disk_usage(self):
+        return sum(size for _, size, _ in self._disk_entries())
+
+    def clear(self):
+        self._memory.clear()
+        self._memory_bytes = 0
+        for _, _, path in self._disk_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self.disk_usage(),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache des labyrinthes générés")
+    parser.add_argument("action", choices=["stats", "clear", "warm"])
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--algorithm", default="kruskal", help="pour warm")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[], help="pour warm")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[1], help="pour warm")
+    args = parser.parse_args()
+
+    cache = MazeCache(args.cache_dir)
+    if args.action == "clear":
+        cache.clear()
+        print(f"Cache {args.cache_dir} vidé")
+    elif args.action == "warm":
+        for n in args.sizes:
+            for seed in args.seeds:
+                cache.get_or_generate(args.algorithm, n, seed)
+        print(f"{cache.misses} labyrinthe(s) généré(s), {cache.disk_hits} déjà en cache")
+    else:
+        for name, value in cache.stats().items():
+            print(f"{name:>16}: {value}")
@@ -0,0 +1,14 @@
+import argparse
+from maze_profile import profile_argument
+
+# Options en ligne de commande des scripts interactifs (les réponses passent
+# par input()) : un seul analyseur pour que tous acceptent les mêmes options.
+
+
+def script_options(argv=None):
+    """Options --profile, --no-explored et --analytics ; les autres arguments sont ignorés."""
+    parser = argparse.ArgumentParser(add_help=False)
+    profile_argument(parser)
+    parser.add_argument("--no-explored", action="store_true", help="solutions sans les cases explorées (*)")
+    parser.add_argument("--analytics", action="store_true", help="colonnes d'analyse de structure (maze_analytics)")
+    return parser.parse_known_args(argv)[0]
@@ -0,0 +1,184 @@
+import struct
+import sys
+import numpy as np
+from maze_grid import MazeGrid, OPEN, EAST, SOUTH, border_line, cells_line, south_line, load_display
+
+# Format binaire .maze : en-tête fixe puis 2 bits de murs (EAST/SOUTH) par
+# cellule, 4 cellules par octet, cellules dans l'ordre ligne par ligne.
+MAGIC = b"AMAZ"
+VERSION = 1
+# magic, version, n, seed (-1 si aucune), entrée (ligne, colonne), sortie (ligne, colonne), algorithme
+HEADER = struct.Struct("<4sB3xIq4I32s4x")
+HEADER_SIZE = HEADER.size
+
+# nombre de rangées de cellules décodées à la fois lors des conversions
+ROW_BLOCK = 256
+
+
+def pack_walls(walls):
+    """Compacte un tableau de murs uint8 (valeurs 0-3) en 4 cellules par octet."""
+    flat = np.asarray(walls, dtype=np.uint8).reshape(-1)
+    pad = (-flat.size) % 4
+    if pad:
+        flat = np.concatenate([flat, np.zeros(pad, dtype=np.uint8)])
+    quads = flat.reshape(-1, 4) & 3
+    return quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6
+
+
+def unpack_walls(packed, start, stop):
+    """Décode les cellules [start, stop) d'un tableau compacté."""
+    first, last = start // 4, -(-stop // 4)
+    data = np.asarray(packed[first:last], dtype=np.uint8)
+    quads = np.empty((data.size, 4), dtype=np.uint8)
+    for k in range(4):
+        quads[:, k] = (data >> (2 * k)) & 3
+    offset = start - 4 * first
+    return quads.reshape(-1)[offset:offset + stop - start]
+
+
+class PackedMaze:
+    """Labyrinthe au format binaire, murs compactés (éventuellement en mmap).
+
+    Se comporte comme un MazeGrid en lecture (to_display, iter_lines, grid) :
+    Solver peut donc être construit directement dessus, sans passer par le texte.
+    """
+
+    def __init__(self, n, packed, seed=None, algorithm="", entrance=None, exit=None):
+        self.n = n
+        self.size = 2 * n + 1
+        self.packed = packed
+        self.seed = seed
+        self.algorithm = algorithm
+        self.entrance = entrance or (0, 1)
+        self.exit = exit or (self.size - 1, self.size - 2)
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def walls_rows(self, r0, r1):
+        """Murs des rangées de cellules [r0, r1) sous forme de tableau (r1-r0) x n."""
+        return unpack_walls(self.packed, r0 * self.n, r1 * self.n).reshape(r1 - r0, self.n)
+
+    def cell_bits(self, cells):
+        """Bits EAST/SOUTH des cellules d'indices à plat `cells` (tableau), lus dans le mmap."""
+        cells = np.asarray(cells)
+        return (np.asarray(self.packed[cells >> 2]) >> ((cells & 3) << 1).astype(np.uint8)) & 3
+
+    def grid(self):
+        """Décode tout le labyrinthe en MazeGrid (1 octet par cellule)."""
+        grid = MazeGrid(self.n, self.walls_rows(0, self.n).copy())
+        grid.entrance, grid.exit = self.entrance, self.exit
+        return grid
+
+    def to_display(self):
+        """Grille texte uint8 complète, remplie par blocs de rangées.
+
+        (2n + 1)² octets (environ 400 Mo pour n = 10000) : le Solver ne la
+        construit que pour les solveurs et le rendu qui en ont besoin.
+        """
+        display = np.empty((self.size, self.size), dtype=np.uint8)
+        for i, line in enumerate(self._iter_display_rows()):
+            display[i] = line
+        return display
+
+    def iter_lines(self):
+        for line in self._iter_display_rows():
+            yield line.tobytes().decode("ascii")
+
+    def _iter_display_rows(self):
+        yield border_line(self.size, self.entrance[1])
+        for r0 in range(0, self.n, ROW_BLOCK):
+            r1 = min(r0 + ROW_BLOCK, self.n)
+            block = self.walls_rows(r0, r1)
+            for r, walls in enumerate(block, start=r0):
+                yield cells_line(walls)
+                if r < self.n - 1:
+                    yield south_line(walls)
+        yield border_line(self.size, self.exit[1])
+
+
+def save_packed(maze, filename, seed=None, algorithm=""):
+    """Écrit un MazeGrid (ou PackedMaze) au format binaire .maze."""
+    packed = maze.packed if isinstance(maze, PackedMaze) else pack_walls(maze.walls)
+    header = HEADER.pack(
+        MAGIC, VERSION, maze.n, -1 if seed is None else seed,
+        *maze.entrance, *maze.exit, algorithm.encode("utf-8")[:32],
+    )
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.write(np.asarray(packed, dtype=np.uint8).tobytes())
+
+
+def load_packed(filename, mmap=True):
+    """Ouvre un fichier .maze ; par défaut les murs restent sur disque (np.memmap)."""
+    with open(filename, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{filename} : en-tête .maze incomplet")
+    magic, version, n, seed, er, ec, xr, xc, algorithm = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} n'est pas un fichier .maze")
+    if version != VERSION:
+        raise ValueError(f"{filename} : version .maze {version} non supportée")
+    count = -(-n * n // 4)
+    if mmap:
+        packed = np.memmap(filename, dtype=np.uint8, mode="r", offset=HEADER_SIZE, shape=(count,))
+    else:
+        packed = np.fromfile(filename, dtype=np.uint8, count=count, offset=HEADER_SIZE)
+    return PackedMaze(
+        n, packed, seed=None if seed < 0 else seed,
+        algorithm=algorithm.rstrip(b"\0").decode("utf-8"),
+        entrance=(er, ec), exit=(xr, xc),
+    )
+
+
+def txt_to_packed(txt_file, maze_file, seed=None, algorithm=""):
+    """Convertit un .txt en .maze par blocs de rangées (le texte est lu en mmap)."""
+    with open(txt_file, "rb") as f:
+        first = f.readline()
+    line_length = len(first)
+    size = len(first.rstrip(b"\r\n "))
+    n = (size - 1) // 2
+    raw = np.memmap(txt_file, dtype=np.uint8, mode="r")
+    if raw.size % line_length:
+        # dernière ligne sans retour à la ligne : lecture complète
+        rows = load_display(txt_file)
+    else:
+        rows = raw.reshape(-1, line_length)
+
+    walls = np.empty((n, n), dtype=np.uint8)
+    for r0 in range(0, n, ROW_BLOCK):
+        r1 = min(r0 + ROW_BLOCK, n)
+        cells = rows[2 * r0 + 1:2 * r1 + 1:2, :size]
+        below = rows[2 * r0 + 2:2 * r1 + 2:2, :size]
+        block = walls[r0:r1]
+        block[:] = EAST | SOUTH
+        block[:, :-1] &= np.where(cells[:, 2:-1:2] == OPEN, ~EAST & 0xFF, 0xFF).astype(np.uint8)
+        last = min(r1, n - 1) - r0
+        block[:last] &= np.where(below[:last, 1:-1:2] == OPEN, ~SOUTH & 0xFF, 0xFF).astype(np.uint8)
+
+    grid = MazeGrid(n, walls)
+    grid.entrance = (0, int(np.argmax(rows[0, :size] == OPEN)))
+    grid.exit = (size - 1, int(np.argmax(rows[size - 1, :size] == OPEN)))
+    save_packed(grid, maze_file, seed=seed, algorithm=algorithm)
+
+
+def packed_to_txt(maze_file, txt_file):
+    """Convertit un .maze en .txt, rangée par rangée (format identique à MazeGrid.save)."""
+    maze = load_packed(maze_file)
+    with open(txt_file, "wb") as f:
+        for line in maze._iter_display_rows():
+            f.write(line.tobytes() + b"\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage : python maze_format.py entree.txt sortie.maze | entree.maze sortie.txt")
+        sys.exit(1)
+    source, target = sys.argv[1:]
+    if source.endswith(".maze"):
+        packed_to_txt(source, target)
+    else:
+        txt_to_packed(source, target)
+    print(f"{source} converti en {target}")
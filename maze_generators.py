@@ -0,0 +1,359 @@
+import abc
+import random
+from array import array
+import numpy as np
+from metrics_probe import DEFAULT_LEVEL
+from metrics_record import MetricsLogger
+from maze_cli import script_options
+from maze_profile import attach_profiler
+from maze_grid import MazeGrid, EAST, SOUTH
+from backtrack_constructor import MazeGeneratorRecursive
+from kruskal_strict import MazeGenerator
+from kruskal_tiled import DEFAULT_TILES, TiledMazeGenerator
+
+DEFAULT_CSV = "constructors_metrics.csv"
+
+# registre nom d'algorithme -> classe de générateur
+GENERATORS = {}
+
+
+def register(name):
+    """Décorateur : enregistre une classe de générateur sous le nom donné."""
+    def decorator(cls):
+        cls.algorithm = name
+        GENERATORS[name] = cls
+        return cls
+    return decorator
+
+
+def get_generator(name):
+    try:
+        return GENERATORS[name]
+    except KeyError:
+        raise ValueError(f"algorithme inconnu : {name} (disponibles : {', '.join(GENERATORS)})") from None
+
+
+class BaseMazeGenerator(abc.ABC):
+    """Moteur commun : graine, journalisation, sauvegarde et affichage.
+
+    generate() produit self.grid (MazeGrid) et la retourne ; une sous-classe
+    incomplète échoue dès sa création (méthodes abstraites).
+    """
+
+    algorithm = None
+    # à incrémenter quand le labyrinthe produit pour une graine donnée change :
+    # les entrées de maze_cache des versions précédentes ne sont alors plus servies
+    version = 1
+
+    def __init__(self, n, seed=None, logger=None, csv_file=DEFAULT_CSV, metrics_level=DEFAULT_LEVEL):
+        self.n = n
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.grid = None  # alloué par generate(), inutile en mode flux
+        self.logger = logger if logger is not None else MetricsLogger(csv_file=csv_file, level=metrics_level)
+
+    @abc.abstractmethod
+    def generate(self):
+        """Génère le labyrinthe (mesures comprises) et retourne self.grid."""
+
+    def _neighbors(self, cell):
+        """Cellules adjacentes (indices à plat)."""
+        n = self.n
+        row, col = divmod(cell, n)
+        if row > 0:
+            yield cell - n
+        if row < n - 1:
+            yield cell + n
+        if col > 0:
+            yield cell - 1
+        if col < n - 1:
+            yield cell + 1
+
+    def save_to_file(self, filename):
+        with self.logger.phase("io"):
+            self.grid.save(filename)
+        print(f"Labyrinthe sauvegardé dans {filename}")
+        self.logger.stop(filename)
+        self.logger.print_metrics()
+
+    def print_maze(self):
+        if self.n > 20:
+            print(f"Labyrinthe généré (taille {self.n}) – affichage désactivé car trop grand.")
+            return
+        for line in self.grid.iter_lines():
+            print(line)
+
+
+class CarvingMazeGenerator(BaseMazeGenerator):
+    """Générateur qui casse les murs d'une MazeGrid neuve : les sous-classes
+    n'implémentent que _carve()."""
+
+    def generate(self):
+        self.logger.start(self.n, self.algorithm, self.seed)
+        with self.logger.phase("carve"):
+            self.grid = MazeGrid(self.n)
+            self._carve()
+        self.logger.end_timing()
+        return self.grid
+
+    @abc.abstractmethod
+    def _carve(self):
+        """Casse les murs de self.grid."""
+
+
+def _open_wall(walls, u, v):
+    """Casse le mur entre deux cellules adjacentes dans un tableau de murs à plat."""
+    if u > v:
+        u, v = v, u
+    walls[u] &= ~(EAST if v - u == 1 else SOUTH) & 0xFF
+
+
+def _neighbor_offsets(n):
+    """Décalages (indices à plat) vers les cellules adjacentes, dans l'ordre de
+    _neighbors, pour chaque classe de bord : table[3 * classe_ligne + classe_colonne],
+    classe = (indice == 0) + 2 * (indice == n - 1), soit 0 intérieur, 1 premier, 2 dernier.
+    Neuf tuples en tout (intérieur, 4 bords, 4 coins), quelle que soit la taille."""
+    table = []
+    for row_class in range(3):
+        for col_class in range(3):
+            table.append(tuple(d for d, ok in ((-n, row_class != 1), (n, row_class != 2),
+                                                (-1, col_class != 1), (1, col_class != 2)) if ok))
+    return tuple(table)
+
+
+class RowMazeGenerator(CarvingMazeGenerator):
+    """Générateur ligne par ligne : seule la ligne courante est en mémoire.
+
+    iter_rows() produit, pour chaque ligne, un tableau uint8 de n murs (bits
+    EAST/SOUTH) ; une ligne ne dépend jamais des suivantes, ce qui permet
+    aussi l'écriture en flux sans construire la grille complète.
+    """
+
+    @abc.abstractmethod
+    def iter_rows(self):
+        """Génère les lignes de murs (tableaux uint8 de n murs), de haut en bas."""
+
+    def _carve(self):
+        for r, row in enumerate(self.iter_rows()):
+            self.grid.walls[r] = row
+        self.logger.increment_edge(max(self.n * self.n - 1, 0))
+
+
+@register("recursive_backtracking")
+class RecursiveBacktrackingGenerator(BaseMazeGenerator):
+    def generate(self):
+        inner = MazeGeneratorRecursive(self.n, seed=self.seed, logger=self.logger)
+        inner.generate()
+        self.grid = inner.grid
+        return self.grid
+
+
+@register("kruskal")
+class KruskalGenerator(BaseMazeGenerator):
+    def generate(self):
+        inner = MazeGenerator(self.n, metrics_logger=self.logger)
+        inner.kruskal_maze_canonical(seed=self.seed)
+        self.grid = inner.maze_grid
+        return self.grid
+
+
+@register("tiled_kruskal")
+class TiledKruskalGenerator(BaseMazeGenerator):
+    """Kruskal par tuiles sur plusieurs processus (labyrinthe propre à chaque nombre de tuiles)."""
+
+    def __init__(self, n, seed=None, logger=None, csv_file=DEFAULT_CSV, metrics_level=DEFAULT_LEVEL,
+                 tiles=DEFAULT_TILES, workers=None):
+        super().__init__(n, seed=seed, logger=logger, csv_file=csv_file, metrics_level=metrics_level)
+        self.tiles = tiles
+        self.workers = workers
+
+    def generate(self):
+        inner = TiledMazeGenerator(self.n, tiles=self.tiles, workers=self.workers, metrics_logger=self.logger)
+        self.grid = inner.generate(seed=self.seed)
+        return self.grid
+
+
+@register("prim")
+class PrimGenerator(CarvingMazeGenerator):
+    """Prim randomisé : on relie au labyrinthe une cellule tirée au hasard dans la frontière."""
+
+    def _carve(self):
+        n = self.n
+        rng = self.rng
+        walls = memoryview(self.grid.walls.reshape(-1))
+        in_maze = bytearray(n * n)
+        in_frontier = bytearray(n * n)
+        frontier = []
+        carved = 0
+
+        def add(cell):
+            in_maze[cell] = 1
+            for nb in self._neighbors(cell):
+                if not in_maze[nb] and not in_frontier[nb]:
+                    in_frontier[nb] = 1
+                    frontier.append(nb)
+
+        add(rng.randrange(n * n))
+        while frontier:
+            # tirage uniforme puis retrait en O(1) (échange avec le dernier)
+            i = rng.randrange(len(frontier))
+            frontier[i], frontier[-1] = frontier[-1], frontier[i]
+            cell = frontier.pop()
+            links = [nb for nb in self._neighbors(cell) if in_maze[nb]]
+            _open_wall(walls, cell, rng.choice(links))
+            carved += 1
+            add(cell)
+
+        self.logger.increment_edge(carved)
+
+
+@register("wilson")
+class WilsonGenerator(CarvingMazeGenerator):
+    """Wilson : marches aléatoires à boucles effacées, arbre couvrant uniforme."""
+
+    def _carve(self):
+        n = self.n
+        rng = self.rng
+        walls = memoryview(self.grid.walls.reshape(-1))
+        in_maze = bytearray(n * n)
+        # dernière sortie de chaque cellule pendant la marche courante :
+        # réécrire la sortie d'une cellule revisitée efface la boucle
+        next_cell = array("q", [0]) * (n * n)
+        offsets = _neighbor_offsets(n)  # rien n'est alloué à chaque pas de la marche
+        # classe de bord de chaque ligne (déjà multipliée par 3) et de chaque colonne : O(n)
+        col_class = bytes((i == 0) + 2 * (i == n - 1) for i in range(n))
+        row_class = bytes(3 * c for c in col_class)
+        steps = 0
+        carved = 0
+
+        in_maze[rng.randrange(n * n)] = 1
+        for start in range(n * n):
+            if in_maze[start]:
+                continue
+            cell = start
+            while not in_maze[cell]:
+                row, col = divmod(cell, n)
+                nxt = cell + rng.choice(offsets[row_class[row] + col_class[col]])
+                next_cell[cell] = nxt
+                cell = nxt
+                steps += 1
+            cell = start
+            while not in_maze[cell]:
+                in_maze[cell] = 1
+                _open_wall(walls, cell, next_cell[cell])
+                carved += 1
+                cell = next_cell[cell]
+
+        self.logger.increment_edge(carved)
+        self.logger.increment_backtrack(steps - carved)  # pas effacés par les boucles
+
+
+@register("eller")
+class EllerGenerator(RowMazeGenerator):
+    """Eller : ensembles de cellules maintenus sur une seule ligne, mémoire O(n)."""
+
+    def iter_rows(self):
+        n = self.n
+        rng = self.rng
+        # étiquettes d'ensemble de la ligne courante ; les étiquettes héritées
+        # de la ligne précédente sont dans [0, n), les nouvelles dans [n, 2n)
+        labels = [-1] * n
+        for r in range(n):
+            last = r == n - 1
+            parent = list(range(2 * n))
+
+            def find(x):
+                while parent[x] != x:
+                    parent[x] = parent[parent[x]]
+                    x = parent[x]
+                return x
+
+            for c in range(n):
+                if labels[c] < 0:
+                    labels[c] = n + c
+            row = bytearray([EAST | SOUTH]) * n
+
+            # fusions horizontales (toutes obligatoires sur la dernière ligne)
+            for c in range(n - 1):
+                a, b = find(labels[c]), find(labels[c + 1])
+                if a != b and (last or rng.random() < 0.5):
+                    parent[b] = a
+                    row[c] &= ~EAST & 0xFF
+
+            if last:
+                yield np.frombuffer(bytes(row), dtype=np.uint8)
+                break
+
+            # ouvertures verticales : au moins une par ensemble
+            members = {}
+            for c in range(n):
+                members.setdefault(find(labels[c]), []).append(c)
+            next_labels = [-1] * n
+            for k, cells in enumerate(members.values()):
+                down = [c for c in cells if rng.random() < 0.5] or [rng.choice(cells)]
+                for c in down:
+                    row[c] &= ~SOUTH & 0xFF
+                    next_labels[c] = k
+            labels = next_labels
+            yield np.frombuffer(bytes(row), dtype=np.uint8)
+
+
+@register("binary_tree")
+class BinaryTreeGenerator(RowMazeGenerator):
+    """Arbre binaire : chaque cellule s'ouvre vers l'est ou vers le sud."""
+
+    def iter_rows(self):
+        n = self.n
+        rng = self.rng
+        for r in range(n):
+            row = bytearray([EAST | SOUTH]) * n
+            for c in range(n):
+                east = c < n - 1
+                south = r < n - 1
+                if east and (not south or rng.random() < 0.5):
+                    row[c] &= ~EAST & 0xFF
+                elif south:
+                    row[c] &= ~SOUTH & 0xFF
+            yield np.frombuffer(bytes(row), dtype=np.uint8)
+
+
+@register("sidewinder")
+class SidewinderGenerator(RowMazeGenerator):
+    """Sidewinder (couloir sur la dernière ligne) : chaque série de cellules
+    d'une ligne s'ouvre vers le sud en un point tiré au hasard."""
+
+    def iter_rows(self):
+        n = self.n
+        rng = self.rng
+        for r in range(n):
+            row = bytearray([EAST | SOUTH]) * n
+            if r == n - 1:
+                for c in range(n - 1):
+                    row[c] &= ~EAST & 0xFF
+            else:
+                run_start = 0
+                for c in range(n):
+                    if c < n - 1 and rng.random() < 0.5:
+                        row[c] &= ~EAST & 0xFF
+                    else:
+                        row[rng.randrange(run_start, c + 1)] &= ~SOUTH & 0xFF
+                        run_start = c + 1
+            yield np.frombuffer(bytes(row), dtype=np.uint8)
+
+
+if __name__ == "__main__":
+    algorithm = input(f"Algorithme ({' / '.join(GENERATORS)}) ?: ").strip().lower()
+    n = int(input("Taille du labyrinthe ?: "))
+    seed_input = input("Seed ? : ").strip()
+    generator = get_generator(algorithm)(n, seed=int(seed_input) if seed_input else None)
+    options = script_options()
+    # --profile [sample|cprofile] : profil écrit à côté du labyrinthe
+    attach_profiler(options.profile, generator.logger, generator, "generate")
+    if options.analytics:  # colonnes d'analyse de structure (maze_analytics)
+        from maze_analytics import attach_analytics
+        attach_analytics(generator.logger, lambda: generator.grid)
+    print("Génération en cours...")
+    generator.generate()
+    generator.print_maze()
+    seed_str = seed_input if seed_input else "random"
+    generator.save_to_file(f"{algorithm}_{n}_{seed_str}.txt")
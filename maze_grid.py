@@ -0,0 +1,273 @@
+import numpy as np
+
+# Codes ASCII des cases de l'affichage texte
+WALL = ord("#")
+OPEN = ord(".")
+
+# Bits de murs d'une cellule : seuls les murs est et sud sont stockés,
+# le mur ouest (resp. nord) d'une cellule est le mur est (resp. sud) de sa voisine
+EAST = 1
+SOUTH = 2
+
+
+class MazeGrid:
+    """Labyrinthe compact : n x n cellules, un octet (2 bits utiles) par cellule.
+
+    La grille texte (2n+1) x (2n+1) utilisée par les fichiers .txt n'est jamais
+    stockée ; elle est reconstruite à la demande (to_display / iter_lines).
+    Entrée en (0, 1), sortie en (2n, 2n-1), en coordonnées d'affichage.
+    """
+
+    def __init__(self, n, walls=None):
+        self.n = n
+        self.size = 2 * n + 1
+        if walls is None:
+            walls = np.full((n, n), EAST | SOUTH, dtype=np.uint8)
+        self.walls = walls
+        self.entrance = (0, 1)
+        self.exit = (self.size - 1, self.size - 2)
+
+    @property
+    def nbytes(self):
+        return self.walls.nbytes
+
+    # --- indexation ---------------------------------------------------------
+
+    def cell_index(self, row, col):
+        return row * self.n + col
+
+    def cell_coords(self, index):
+        return divmod(index, self.n)
+
+    def display_coords(self, row, col):
+        """Coordonnées (ligne, colonne) de la cellule dans la grille texte."""
+        return 2 * row + 1, 2 * col + 1
+
+    def wall_between(self, u, v):
+        """Retourne (cellule, bit) portant le mur entre deux cellules adjacentes."""
+        if u > v:
+            u, v = v, u
+        if v == u + 1 and v % self.n:
+            return u, EAST
+        if v == u + self.n:
+            return u, SOUTH
+        raise ValueError(f"cellules {u} et {v} non adjacentes")
+
+    def carve(self, u, v):
+        """Casse le mur entre deux cellules adjacentes (indices à plat)."""
+        cell, bit = self.wall_between(u, v)
+        self.walls.flat[cell] &= ~bit & 0xFF
+
+    def carve_east(self, row, col):
+        self.walls[row, col] &= ~EAST & 0xFF
+
+    def carve_south(self, row, col):
+        self.walls[row, col] &= ~SOUTH & 0xFF
+
+    def walls_rows(self, r0, r1):
+        """Murs des rangées de cellules [r0, r1) (vue, sans copie)."""
+        return self.walls[r0:r1]
+
+    def cell_bits(self, cells):
+        """Bits EAST/SOUTH des cellules d'indices à plat `cells` (tableau)."""
+        return self.walls.reshape(-1)[cells]
+
+    def is_open(self, x, y):
+        """Indique si la case (x, y) de la grille texte est un passage."""
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return False
+        if (x, y) == self.entrance or (x, y) == self.exit:
+            return True
+        if x == 0 or y == 0 or x == self.size - 1 or y == self.size - 1:
+            return False
+        if x % 2 and y % 2:
+            return True
+        if x % 2:
+            return not self.walls[x // 2, y // 2 - 1] & EAST
+        if y % 2:
+            return not self.walls[x // 2 - 1, y // 2] & SOUTH
+        return False
+
+    # --- conversion vers / depuis la grille texte ---------------------------
+
+    def display_row(self, i):
+        """Ligne i de la grille texte sous forme de tableau uint8."""
+        if i == 0:
+            return border_line(self.size, self.entrance[1])
+        if i == self.size - 1:
+            return border_line(self.size, self.exit[1])
+        if i % 2:
+            return cells_line(self.walls[i // 2])
+        return south_line(self.walls[i // 2 - 1])
+
+    def to_display(self):
+        """Grille texte complète (size x size, uint8)."""
+        display = np.full((self.size, self.size), WALL, dtype=np.uint8)
+        display[1::2, 1::2] = OPEN
+        display[1::2, 2:-1:2][(self.walls[:, :-1] & EAST) == 0] = OPEN
+        display[2:-1:2, 1::2][(self.walls[:-1] & SOUTH) == 0] = OPEN
+        display[self.entrance] = OPEN
+        display[self.exit] = OPEN
+        return display
+
+    def iter_lines(self):
+        """Génère les lignes texte une à une, sans construire toute la grille."""
+        for i in range(self.size):
+            yield self.display_row(i).tobytes().decode("ascii")
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            for line in self.iter_lines():
+                f.write(line + "\n")
+
+    @classmethod
+    def from_display(cls, display):
+        """Reconstruit un MazeGrid depuis une grille texte (liste de str ou tableau)."""
+        display = as_display_array(display)
+        n = (display.shape[0] - 1) // 2
+        walls = np.zeros((n, n), dtype=np.uint8)
+        walls[:, :-1] |= np.where(display[1:-1:2, 2:-1:2] == OPEN, 0, EAST).astype(np.uint8)
+        walls[:, -1] |= EAST
+        walls[:-1] |= np.where(display[2:-1:2, 1:-1:2] == OPEN, 0, SOUTH).astype(np.uint8)
+        walls[-1] |= SOUTH
+        return cls(n, walls)
+
+    @classmethod
+    def load(cls, filename):
+        return cls.from_display(load_display(filename))
+
+
+def border_line(size, opening):
+    """Ligne de bord (haut ou bas) avec une seule ouverture."""
+    line = np.full(size, WALL, dtype=np.uint8)
+    line[opening] = OPEN
+    return line
+
+
+def cells_line(walls):
+    """Ligne texte des cellules d'une rangée de murs (cellules et murs est)."""
+    line = np.full(2 * len(walls) + 1, WALL, dtype=np.uint8)
+    line[1::2] = OPEN
+    line[2:-1:2][(walls[:-1] & EAST) == 0] = OPEN
+    return line
+
+
+def south_line(walls):
+    """Ligne texte des murs sud d'une rangée de murs."""
+    line = np.full(2 * len(walls) + 1, WALL, dtype=np.uint8)
+    line[1::2][(walls & SOUTH) == 0] = OPEN
+    return line
+
+
+def display_opener(maze):
+    """Fonction indice à plat de la grille texte -> passage ? (cf. MazeGrid.is_open),
+    lue dans les bits de murs (MazeGrid, ou PackedMaze compacté / en mmap) :
+    la grille texte n'est pas construite. Le décodage est écrit dans la fonction
+    (un seul appel par case testée)."""
+    size, n = maze.size, maze.n
+    last = size - 1
+    ouvertures = (maze.entrance[0] * size + maze.entrance[1], maze.exit[0] * size + maze.exit[1])
+    packed = getattr(maze, "packed", None)
+
+    if packed is None:
+        walls = memoryview(np.ascontiguousarray(maze.walls).reshape(-1))
+
+        def is_open(index):
+            x, y = divmod(index, size)
+            if x & 1:
+                if y & 1:
+                    return True  # cellule (jamais sur le bord)
+                if 0 < y < last:
+                    return not walls[(x >> 1) * n + (y >> 1) - 1] & EAST  # mur est de la cellule de gauche
+            elif y & 1:
+                if 0 < x < last:
+                    return not walls[((x >> 1) - 1) * n + (y >> 1)] & SOUTH  # mur sud de la cellule du dessus
+            return index in ouvertures  # bords (entrée, sortie) et coins entre quatre cellules
+        return is_open
+
+    data = memoryview(np.asarray(packed))  # 4 cellules par octet
+
+    def is_open(index):
+        x, y = divmod(index, size)
+        if x & 1:
+            if y & 1:
+                return True
+            if 0 < y < last:
+                cell = (x >> 1) * n + (y >> 1) - 1
+                return not (data[cell >> 2] >> ((cell & 3) << 1)) & EAST
+        elif y & 1:
+            if 0 < x < last:
+                cell = ((x >> 1) - 1) * n + (y >> 1)
+                return not (data[cell >> 2] >> ((cell & 3) << 1)) & SOUTH
+        return index in ouvertures
+    return is_open
+
+
+def display_open(maze, x, y):
+    """Version vectorisée de display_opener : tableau booléen des passages aux
+    coordonnées (x, y) de la grille texte (hors grille : False)."""
+    size, n = maze.size, maze.n
+    last = size - 1
+    x = np.asarray(x)
+    y = np.asarray(y)
+    ouvert = np.zeros(x.shape, dtype=bool)
+    for ex, ey in (maze.entrance, maze.exit):
+        ouvert |= (x == ex) & (y == ey)
+    interieur = (x > 0) & (y > 0) & (x < last) & (y < last)
+    impair_x = (x & 1) == 1
+    impair_y = (y & 1) == 1
+    ouvert |= interieur & impair_x & impair_y
+    est = interieur & impair_x & ~impair_y
+    if est.any():
+        ouvert[est] = (maze.cell_bits((x[est] >> 1) * n + (y[est] >> 1) - 1) & EAST) == 0
+    sud = interieur & ~impair_x & impair_y
+    if sud.any():
+        ouvert[sud] = (maze.cell_bits(((x[sud] >> 1) - 1) * n + (y[sud] >> 1)) & SOUTH) == 0
+    return ouvert
+
+
+def display_rows(maze, x0, x1):
+    """Rangées [x0, x1) de la grille texte (uint8), décodées depuis les murs des
+    seules rangées de cellules concernées (MazeGrid ou PackedMaze)."""
+    size = maze.size
+    rows = np.empty((max(x1 - x0, 0), size), dtype=np.uint8)
+    r0 = max((x0 - 1) // 2, 0)
+    walls = maze.walls_rows(r0, min((x1 - 1) // 2 + 1, maze.n))
+    for i in range(x0, x1):
+        if i == 0:
+            rows[i - x0] = border_line(size, maze.entrance[1])
+        elif i == size - 1:
+            rows[i - x0] = border_line(size, maze.exit[1])
+        elif i % 2:
+            rows[i - x0] = cells_line(walls[i // 2 - r0])
+        else:
+            rows[i - x0] = south_line(walls[i // 2 - 1 - r0])
+    return rows
+
+
+def as_display_array(labyrinthe):
+    """Convertit un labyrinthe (liste de str/listes, tableau, MazeGrid) en tableau uint8 2D."""
+    if isinstance(labyrinthe, np.ndarray):
+        return np.ascontiguousarray(labyrinthe, dtype=np.uint8)
+    if hasattr(labyrinthe, "to_display"):
+        return labyrinthe.to_display()
+    rows = ["".join(row) if not isinstance(row, str) else row for row in labyrinthe]
+    data = "".join(rows).encode("ascii")
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(rows), -1).copy()
+
+
+def load_display(filename):
+    """Lit un fichier .txt de labyrinthe directement en tableau uint8 2D."""
+    raw = np.fromfile(filename, dtype=np.uint8)
+    newlines = np.flatnonzero(raw == ord("\n"))
+    line_length = int(newlines[0]) + 1 if newlines.size else raw.size + 1
+    if raw.size % line_length:
+        # dernière ligne sans fin de ligne ("\n" ou les deux octets de "\r\n") :
+        # complétée jusqu'à la longueur des autres lignes
+        raw = np.append(raw, np.full(line_length - raw.size % line_length, ord("\n"), dtype=np.uint8))
+    rows = raw.reshape(-1, line_length)
+    width = line_length - 1
+    # fichiers écrits sous Windows : fin de ligne "\r\n"
+    while width and rows[0, width - 1] in (ord("\r"), ord(" ")):
+        width -= 1
+    return np.ascontiguousarray(rows[:, :width])
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import statistics
+import time
+from batch_runner import percentile
+from maze_service import DEFAULT_HOST, DEFAULT_PORT
+
+# Test de charge du service (maze_service.py) : `concurrency` connexions
+# keep-alive envoient en boucle les requêtes de la liste, puis le débit et la
+# latence (médiane, p95, p99) sont affichés.
+
+
+async def read_response(reader):
+    """Lit une réponse HTTP/1.1 (Content-Length ou chunked) ; retourne (statut, taille du corps)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connexion fermée par le service")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        size = 0
+        while True:
+            length = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(length + 2)  # morceau + CRLF
+            size += length
+            if length == 0:
+                return status, size
+    length = int(headers.get("content-length", 0))
+    await reader.readexactly(length)
+    return status, length
+
+
+async def _client(host, port, unix_path, targets, counter, total, latencies, results):
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            i = counter[0]
+            counter[0] += 1
+            target = targets[i % len(targets)]
+            start = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status, size = await read_response(reader)
+            latencies.append((time.perf_counter() - start) * 1000)
+            results.append((status, size))
+    finally:
+        writer.close()
+
+
+async def run_load(targets, requests, concurrency, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, warmup=0):
+    """Envoie `requests` requêtes sur `concurrency` connexions ; retourne le résumé."""
+    if warmup:
+        await asyncio.gather(*(_client(host, port, unix_path, targets, [0], warmup, [], [])
+                               for _ in range(min(concurrency, warmup))))
+    counter, latencies, results = [0], [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, unix_path, targets, counter, requests, latencies, results)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(results),
+        "errors": sum(1 for status, _ in results if status != 200),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2),
+        "throughput_mb_s": round(sum(size for _, size in results) / elapsed / (1024 * 1024), 2),
+        "latency_median_ms": round(statistics.median(latencies), 2),
+        "latency_p95_ms": round(percentile(latencies, 95), 2),
+        "latency_p99_ms": round(percentile(latencies, 99), 2),
+        "latency_max_ms": round(max(latencies), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge du service des labyrinthes")
+    parser.add_argument("targets", nargs="*", default=["/solve?algorithm=kruskal&n=100&seed=1&format=json"],
+                        help="chemins demandés à tour de rôle, ex. /generate?n=200&seed=3")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None, help="socket Unix du service")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16, help="connexions simultanées")
+    parser.add_argument("--warmup", type=int, default=0, help="requêtes d'échauffement non mesurées")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(args.targets, args.requests, args.concurrency,
+                                   args.host, args.port, args.unix, args.warmup))
+    for name, value in summary.items():
+        print(f"{name:>18}: {value}")
@@ -0,0 +1,175 @@
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Profilage à la demande des générateurs et solveurs (option --profile).
+#   sample   : échantillonnage de la pile toutes les SAMPLE_INTERVAL s par un thread,
+#              exporté en piles repliées (.collapsed, flamegraph.pl / speedscope)
+#              et au format speedscope (.speedscope.json)
+#   cprofile : cProfile déterministe, exporté en .prof (pstats, snakeviz)
+# Sans --profile aucune méthode n'est enveloppée : aucun coût.
+PROFILE_MODES = ("sample", "cprofile")
+SAMPLE_INTERVAL = 0.001
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def profile_argument(parser):
+    parser.add_argument("--profile", nargs="?", const="sample", default=None, choices=PROFILE_MODES,
+                        help="profile la génération / résolution (défaut : sample)")
+
+
+def profile_path(filename, mode):
+    """Fichier de profil associé à un fichier de sortie (colonne profile_file des métriques)."""
+    base = os.path.splitext(filename)[0] + ".profile"
+    return base + (".prof" if mode == "cprofile" else ".speedscope.json")
+
+
+class Profiler:
+    """Profile les appels de méthodes choisies (wrap), appels imbriqués compris.
+
+    Les mesures s'accumulent jusqu'à save(), qui écrit le profil de la
+    mesure en cours et repart de zéro.
+    """
+
+    def __init__(self, mode="sample", interval=SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Mode de profilage inconnu : {mode} (choix : {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.interval = interval
+        self._depth = 0
+        self._wrapper_code = None
+        self._thread = None
+        self._done = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.stacks = Counter()  # pile (racine -> feuille) -> nombre d'échantillons
+        self.samples = 0
+        self.duration = 0.0  # secondes passées dans les méthodes profilées
+        self._cprofile = cProfile.Profile() if self.mode == "cprofile" else None
+
+    def wrap(self, obj, *names):
+        """Remplace les méthodes `names` de l'instance obj par des versions profilées."""
+        for name in names:
+            setattr(obj, name, self._wrapper(getattr(obj, name)))
+        return obj
+
+    def _wrapper(self, method):
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            self._enter(sys._getframe())
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._exit()
+        self._wrapper_code = profiled.__code__
+        return profiled
+
+    def _enter(self, frame):
+        self._depth += 1
+        if self._depth > 1:
+            return  # déjà dans une méthode profilée
+        self._start = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+            return
+        self._root = frame  # les piles s'arrêtent sous l'enveloppe
+        self._target = threading.get_ident()
+        # le thread d'échantillonnage n'obtient le GIL qu'à chaque changement de thread
+        self._switch = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch, self.interval))
+        self._done.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def _exit(self):
+        self._depth -= 1
+        if self._depth:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        else:
+            self._done.set()
+            self._thread.join()
+            self._thread = None
+            sys.setswitchinterval(self._switch)
+        self.duration += time.perf_counter() - self._start
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None and frame is not self._root:
+                code = frame.f_code
+                if code is not self._wrapper_code:  # enveloppes des méthodes imbriquées
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    # --- export --------------------------------------------------------------------
+
+    def collapsed_lines(self):
+        """Piles repliées : "f1;f2;f3 <échantillons>", une ligne par pile."""
+        for stack, count in self.stacks.most_common():
+            names = [f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack]
+            yield f"{';'.join(names)} {count}"
+
+    def speedscope(self, name):
+        frames, index = [], {}
+        samples, weights = [], []
+        period_ms = self.duration * 1000 / self.samples if self.samples else 0.0
+        for stack, count in self.stacks.items():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(round(count * period_ms, 3))
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "amazing-mazes",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "milliseconds",
+                "startValue": 0, "endValue": round(sum(weights), 3),
+                "samples": samples, "weights": weights,
+            }],
+        }
+
+    def save(self, filename):
+        """Écrit le profil associé au fichier de sortie `filename` ; retourne son chemin."""
+        path = profile_path(filename, self.mode)
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(path)
+        else:
+            with open(os.path.splitext(filename)[0] + ".profile.collapsed", "w", encoding="utf-8") as f:
+                for line in self.collapsed_lines():
+                    f.write(line + "\n")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.speedscope(os.path.basename(filename)), f)
+        self.reset()
+        return path
+
+
+def attach_profiler(mode, logger, obj, *names):
+    """Profile les méthodes `names` de obj si mode n'est pas None.
+
+    Le profil est écrit par logger.stop(filename), à côté de `filename`, et
+    son nom est enregistré dans la colonne profile_file de la ligne de métriques.
+    """
+    if mode is None:
+        return None
+    profiler = Profiler(mode)
+    profiler.wrap(obj, *names)
+    logger.profiler = profiler
+    return profiler
@@ -0,0 +1,349 @@
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from maze_cache import DEFAULT_CACHE_DIR, DEFAULT_MEMORY_BUDGET, MazeCache
+from maze_format import HEADER, MAGIC, VERSION, PackedMaze, pack_walls
+from maze_generators import GENERATORS, get_generator
+
+# Service HTTP local (asyncio) : génération, résolution et rendu sans relancer
+# d'interpréteur. Le calcul part dans un pool de processus déjà démarrés, les
+# labyrinthes récents restent en mémoire et les gros résultats sont envoyés
+# par morceaux (Transfer-Encoding: chunked).
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_SIZE = 5000  # n maximal accepté par requête
+CHUNK_LINES = 256  # lignes de texte par morceau
+CHUNK_BYTES = 1 << 16  # octets par morceau (binaire, solution)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# --- côté processus du pool -----------------------------------------------------
+
+_worker_cache = None
+
+
+def _init_worker(cache_dir):
+    """Initialise un processus du pool : imports lourds et cache disque partagé."""
+    global _worker_cache
+    import mazes_solvers  # noqa: F401  (PIL, NumPy, solveurs chargés une fois pour toutes)
+    # les labyrinthes chauds sont gardés par le service, pas par chaque processus
+    _worker_cache = MazeCache(cache_dir, memory_budget=0) if cache_dir else None
+
+
+def _ping():
+    return os.getpid()
+
+
+def _generate_job(algorithm, n, seed):
+    if _worker_cache is not None:
+        return _worker_cache.get_or_generate(algorithm, n, seed)
+    grid = get_generator(algorithm)(n, seed=seed, csv_file=None).generate()
+    return PackedMaze(n, pack_walls(grid.walls), seed=seed, algorithm=algorithm, entrance=grid.entrance, exit=grid.exit)
+
+
+def _solve_job(maze, solver_name, pixel_size=None, show_explored=True):
+    """Résout `maze` ; retourne (solution en texte ou image PNG, longueur du chemin, durée en ms)."""
+    from mazes_solvers import SOLVEURS, Solver, render_image
+    from maze_grid import as_display_array
+
+    solver = Solver(maze, maze.entrance, maze.exit, show_explored=show_explored)
+    start = time.perf_counter()
+    if solver_name:
+        solution, chemin = getattr(solver, SOLVEURS[solver_name])()
+    else:
+        solution, chemin = maze.to_display(), []  # rendu du labyrinthe seul
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if solution is None:
+        return None, 0, elapsed_ms
+    if pixel_size is None:
+        return solution.tobytes(), len(chemin), elapsed_ms
+    buffer = BytesIO()
+    render_image(as_display_array(solution), pixel_size).save(buffer, format="PNG")
+    return buffer.getvalue(), len(chemin), elapsed_ms
+
+
+# --- HTTP --------------------------------------------------------------------------
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _head(status, content_type, headers):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_response(writer, status, body=b"", content_type="application/json", headers=None):
+    headers = dict(headers or {}, **{"Content-Length": len(body)})
+    writer.write(_head(status, content_type, headers))
+    writer.write(body)
+    await writer.drain()
+
+
+async def send_chunked(writer, status, chunks, content_type, headers=None):
+    """Envoie les morceaux au fil de l'eau ; drain() limite la mémoire tampon côté serveur."""
+    headers = dict(headers or {}, **{"Transfer-Encoding": "chunked"})
+    writer.write(_head(status, content_type, headers))
+    for chunk in chunks:
+        if chunk:
+            writer.writelines((b"%x\r\n" % len(chunk), chunk, b"\r\n"))
+            await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _byte_chunks(data):
+    view = memoryview(data)
+    for start in range(0, len(view), CHUNK_BYTES):
+        yield view[start:start + CHUNK_BYTES]
+
+
+def _line_chunks(lines):
+    block = []
+    for line in lines:
+        block.append(line)
+        if len(block) == CHUNK_LINES:
+            yield ("\n".join(block) + "\n").encode("ascii")
+            block = []
+    if block:
+        yield ("\n".join(block) + "\n").encode("ascii")
+
+
+def _packed_chunks(maze):
+    """Fichier .maze (en-tête puis murs compactés) en morceaux."""
+    yield HEADER.pack(MAGIC, VERSION, maze.n, -1 if maze.seed is None else maze.seed,
+                      *maze.entrance, *maze.exit, maze.algorithm.encode("utf-8")[:32])
+    yield from _byte_chunks(np.asarray(maze.packed, dtype=np.uint8).tobytes())
+
+
+class MazeService:
+    """Service asyncio : un pool de processus chaud pour le calcul, un LRU en
+    mémoire pour les labyrinthes récents, des réponses envoyées par morceaux.
+
+    Routes (GET, paramètres en query string) :
+      /generate?algorithm=kruskal&n=100&seed=1&format=txt|maze
+      /solve?...&solver=astar&format=txt|json[&explored=0]
+      /render?...[&solver=astar]&pixel_size=4  (PNG)
+      /stats
+    """
+
+    def __init__(self, workers=None, cache_dir=DEFAULT_CACHE_DIR, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 max_size=DEFAULT_MAX_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        # LRU des labyrinthes chauds ; les fichiers .maze sont écrits par les processus du pool
+        self.cache = MazeCache(cache_dir, memory_budget=memory_budget, disk_budget=0)
+        self.pool = None
+        self.requests = 0
+        self.errors = 0
+        self._inflight = {}  # (algorithme, n, graine) -> tâche de génération en cours
+
+    async def start_pool(self):
+        """Démarre les processus et attend qu'ils soient tous prêts (imports faits)."""
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=mp.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(self.cache_dir,))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ping) for _ in range(self.workers)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    # --- labyrinthes -------------------------------------------------------------------
+
+    def _maze_params(self, query):
+        algorithm = query.get("algorithm", "kruskal")
+        if algorithm not in GENERATORS:
+            raise HttpError(400, f"générateur inconnu : {algorithm}")
+        try:
+            n = int(query.get("n", ""))
+            seed = int(query["seed"]) if "seed" in query else random.getrandbits(31)
+        except ValueError:
+            raise HttpError(400, "n et seed doivent être des entiers")
+        if not 1 <= n <= self.max_size:
+            raise HttpError(400, f"n doit être compris entre 1 et {self.max_size}")
+        return algorithm, n, seed
+
+    async def maze(self, algorithm, n, seed):
+        """PackedMaze pour (algorithme, n, graine) : mémoire, disque, sinon généré dans le pool.
+
+        Des requêtes simultanées pour le même labyrinthe attendent la même génération.
+        """
+        maze = self.cache.get(algorithm, n, seed)
+        if maze is not None:
+            return maze
+        key = (algorithm, n, seed)
+        task = self._inflight.get(key)
+        if task is None:
+            self.cache.misses += 1
+            task = asyncio.ensure_future(self._generate(algorithm, n, seed))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _generate(self, algorithm, n, seed):
+        maze = await self._run(_generate_job, algorithm, n, seed)
+        return self.cache.put(algorithm, n, seed, maze)
+
+    # --- routes ------------------------------------------------------------------------
+
+    async def route_generate(self, query, writer):
+        algorithm, n, seed = self._maze_params(query)
+        maze = await self.maze(algorithm, n, seed)
+        headers = {"X-Maze-Seed": seed}
+        if query.get("format", "txt") == "maze":
+            await send_chunked(writer, 200, _packed_chunks(maze), "application/octet-stream", headers)
+        else:
+            await send_chunked(writer, 200, _line_chunks(maze.iter_lines()), "text/plain; charset=ascii", headers)
+
+    def _solver_name(self, query, default):
+        from mazes_solvers import SOLVEURS
+
+        name = query.get("solver", default)
+        if name and name not in SOLVEURS:
+            raise HttpError(400, f"solveur inconnu : {name} (choix : {', '.join(SOLVEURS)})")
+        return name
+
+    async def route_solve(self, query, writer):
+        algorithm, n, seed = self._maze_params(query)
+        solver_name = self._solver_name(query, "astar")
+        maze = await self.maze(algorithm, n, seed)
+        show_explored = query.get("explored", "1") != "0"
+        solution, length, elapsed_ms = await self._run(_solve_job, maze, solver_name, None, show_explored)
+        if solution is None:
+            raise HttpError(404, "aucun chemin trouvé")
+        headers = {"X-Maze-Seed": seed, "X-Path-Length": length, "X-Solve-Time-Ms": f"{elapsed_ms:.2f}"}
+        if query.get("format", "txt") == "json":
+            body = json.dumps({"algorithm": algorithm, "n": n, "seed": seed, "solver": solver_name,
+                               "path_length": length, "solve_time_ms": round(elapsed_ms, 2)}).encode("utf-8")
+            await send_response(writer, 200, body, headers=headers)
+        else:
+            await send_chunked(writer, 200, _byte_chunks(solution), "text/plain; charset=ascii", headers)
+
+    async def route_render(self, query, writer):
+        from mazes_solvers import MAX_IMAGE_PIXELS
+
+        algorithm, n, seed = self._maze_params(query)
+        solver_name = self._solver_name(query, None)
+        try:
+            pixel_size = max(1, int(query.get("pixel_size", 4)))
+        except ValueError:
+            raise HttpError(400, "pixel_size doit être un entier")
+        size = 2 * n + 1
+        pixel_size = min(pixel_size, max(1, int((MAX_IMAGE_PIXELS / (size * size)) ** 0.5)))
+        maze = await self.maze(algorithm, n, seed)
+        image, _, _ = await self._run(_solve_job, maze, solver_name, pixel_size)
+        if image is None:
+            raise HttpError(404, "aucun chemin trouvé")
+        await send_chunked(writer, 200, _byte_chunks(image), "image/png", {"X-Maze-Seed": seed})
+
+    async def route_stats(self, query, writer):
+        stats = dict(self.cache.stats(), workers=self.workers, requests=self.requests, errors=self.errors)
+        await send_response(writer, 200, json.dumps(stats).encode("utf-8"))
+
+    ROUTES = {
+        "/generate": route_generate,
+        "/solve": route_solve,
+        "/render": route_render,
+        "/stats": route_stats,
+    }
+
+    # --- connexions --------------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        """Une connexion : requêtes HTTP/1.1 successives (keep-alive) jusqu'à fermeture."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await send_response(writer, 400, json.dumps({"error": "requête invalide"}).encode("utf-8"), headers={"Connection": "close"})
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await self.dispatch(method, target, writer)
+                if version != "HTTP/1.1" or headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client parti
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, writer):
+        self.requests += 1
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            route = self.ROUTES.get(url.path)
+            if route is None:
+                raise HttpError(404, f"route inconnue : {url.path}")
+            if method != "GET":
+                raise HttpError(405, "seule la méthode GET est acceptée")
+            await route(self, query, writer)
+        except HttpError as e:
+            self.errors += 1
+            await send_response(writer, e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+        except ConnectionError:
+            raise
+        except Exception as e:  # erreur d'un processus du pool : le service continue
+            self.errors += 1
+            await send_response(writer, 500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode("utf-8"))
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        await self.start_pool()
+        try:
+            if unix_path:
+                server = await asyncio.start_unix_server(self.handle, path=unix_path)
+                where = unix_path
+            else:
+                server = await asyncio.start_server(self.handle, host, port)
+                where = f"http://{host}:{port}"
+            print(f"Service des labyrinthes sur {where} ({self.workers} processus)")
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP local de génération, résolution et rendu")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", default=None, help="socket Unix à la place de TCP")
+    parser.add_argument("--workers", type=int, default=None, help="processus de calcul (défaut : nombre de cœurs)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="cache disque (\"\" pour le désactiver)")
+    parser.add_argument("--memory-budget", type=int, default=DEFAULT_MEMORY_BUDGET,
+                        help="octets de labyrinthes compactés gardés en mémoire")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="n maximal par requête")
+    args = parser.parse_args()
+
+    service = MazeService(args.workers, args.cache_dir, args.memory_budget, args.max_size)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("Service arrêté")
@@ -0,0 +1,65 @@
+import argparse
+import sys
+from maze_generators import DEFAULT_CSV, RowMazeGenerator, GENERATORS, get_generator
+from maze_grid import border_line, cells_line, south_line
+from metrics_probe import DEFAULT_LEVEL, METRICS_LEVELS
+
+# Générateurs utilisables en flux (une ligne de cellules à la fois)
+STREAMING_GENERATORS = [name for name, cls in GENERATORS.items() if issubclass(cls, RowMazeGenerator)]
+
+
+def iter_maze_lines(generator):
+    """Lignes texte (bytes, avec "\\n") du labyrinthe, produites au fil des rangées.
+
+    La mémoire reste bornée à une rangée de murs et deux lignes texte, quelle
+    que soit la taille : le format est identique à MazeGrid.save().
+    """
+    size = 2 * generator.n + 1
+    yield border_line(size, 1).tobytes() + b"\n"
+    last = generator.n - 1
+    for r, walls in enumerate(generator.iter_rows()):
+        yield cells_line(walls).tobytes() + b"\n"
+        if r < last:
+            yield south_line(walls).tobytes() + b"\n"
+    yield border_line(size, size - 2).tobytes() + b"\n"
+
+
+def stream_maze(n, out, seed=None, algorithm="eller", csv_file=DEFAULT_CSV, metrics_level=DEFAULT_LEVEL):
+    """Génère et écrit le labyrinthe directement dans out (fichier binaire ou chemin).
+
+    Retourne le générateur, dont le logger contient les métriques de la génération.
+    """
+    cls = get_generator(algorithm)
+    if not issubclass(cls, RowMazeGenerator):
+        raise ValueError(f"{algorithm} ne génère pas ligne par ligne (flux possible : {', '.join(STREAMING_GENERATORS)})")
+    generator = cls(n, seed=seed, csv_file=csv_file, metrics_level=metrics_level)
+    generator.logger.start(n, algorithm, seed)
+
+    if isinstance(out, str):
+        with open(out, "wb") as f:
+            f.writelines(iter_maze_lines(generator))
+        filename = out
+    else:
+        out.writelines(iter_maze_lines(generator))
+        filename = ""
+    generator.logger.increment_edge(max(n * n - 1, 0))
+    generator.logger.stop(filename)
+    return generator
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération en flux d'un labyrinthe, rangée par rangée")
+    parser.add_argument("n", type=int, help="taille du labyrinthe (n x n cellules)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--algorithm", default="eller", choices=STREAMING_GENERATORS)
+    parser.add_argument("-o", "--output", default="-", help="fichier de sortie (- pour la sortie standard)")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="fichier CSV des métriques")
+    parser.add_argument("--metrics-level", default=DEFAULT_LEVEL, choices=METRICS_LEVELS)
+    args = parser.parse_args()
+
+    out = sys.stdout.buffer if args.output == "-" else args.output
+    generator = stream_maze(args.n, out, seed=args.seed, algorithm=args.algorithm, csv_file=args.csv,
+                            metrics_level=args.metrics_level)
+    if args.output != "-":
+        print(f"Labyrinthe écrit dans {args.output}")
+        generator.logger.print_metrics()
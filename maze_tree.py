@@ -0,0 +1,74 @@
+from array import array
+from maze_grid import OPEN, as_display_array
+
+
+class MazeTree:
+    """Index d'arbre d'un labyrinthe parfait : parent et profondeur de chaque case.
+
+    Construit une seule fois (parcours en largeur depuis la racine), il répond
+    ensuite au chemin entre deux cases quelconques en O(longueur du chemin) :
+    on remonte la case la plus profonde jusqu'à égalité de profondeur, puis
+    les deux ensemble jusqu'à leur plus proche ancêtre commun.
+    """
+
+    def __init__(self, labyrinthe, racine):
+        grille = as_display_array(labyrinthe)
+        self.n, self.m = grille.shape
+        m = self.m
+        taille = self.n * m
+        cases = memoryview(grille.reshape(-1))
+        self.racine = racine[0] * m + racine[1]
+
+        parent = array('i', [-1]) * taille
+        profondeur = array('i', [-1]) * taille
+        profondeur[self.racine] = 0
+        file = array('i', [self.racine])
+        tete = 0
+        while tete < len(file):
+            case = file[tete]
+            tete += 1
+            p = profondeur[case] + 1
+            y = case % m
+            for voisin in (
+                case + 1 if y < m - 1 else -1,
+                case + m if case + m < taille else -1,
+                case - m,
+                case - 1 if y > 0 else -1,
+            ):
+                if voisin >= 0 and cases[voisin] == OPEN and profondeur[voisin] < 0:
+                    profondeur[voisin] = p
+                    parent[voisin] = case
+                    file.append(voisin)
+
+        self.parent = parent
+        self.profondeur = profondeur
+        self.taille = len(file)  # nombre de cases atteintes
+
+    def _indice(self, case):
+        return case[0] * self.m + case[1]
+
+    def chemin(self, a, b):
+        """Chemin (liste de (x, y)) de a à b, ou None si b n'est pas relié à a."""
+        parent, profondeur = self.parent, self.profondeur
+        u, v = self._indice(a), self._indice(b)
+        if profondeur[u] < 0 or profondeur[v] < 0:
+            return None
+        gauche, droite = [], []
+        while profondeur[u] > profondeur[v]:
+            gauche.append(u)
+            u = parent[u]
+        while profondeur[v] > profondeur[u]:
+            droite.append(v)
+            v = parent[v]
+        while u != v:
+            gauche.append(u)
+            droite.append(v)
+            u, v = parent[u], parent[v]
+        gauche.append(u)
+        gauche.extend(reversed(droite))
+        m = self.m
+        return [divmod(case, m) for case in gauche]
+
+    def distance(self, a, b):
+        chemin = self.chemin(a, b)
+        return None if chemin is None else len(chemin) - 1
@@ -0,0 +1,168 @@
+import argparse
+import random
+from collections import OrderedDict
+import numpy as np
+from kruskal_tiled import kruskal_rect
+from maze_grid import EAST, SOUTH, OPEN, WALL
+
+# Côté d'un bloc (en cellules) et nombre de blocs gardés en mémoire par défaut
+DEFAULT_BLOCK = 256
+DEFAULT_MAX_BLOCKS = 64
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(*values):
+    """Hachage 64 bits stable (splitmix64 enchaîné) d'entiers quelconques."""
+    h = 0x9E3779B97F4A7C15
+    for value in values:
+        h = (h ^ (value & _MASK64)) & _MASK64
+        h = (h + 0x9E3779B97F4A7C15) & _MASK64
+        h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK64
+        h ^= h >> 31
+    return h
+
+
+class VirtualMaze:
+    """Labyrinthe parfait n x n dont les blocs ne sont générés qu'au premier accès.
+
+    - chaque bloc (bx, by) est un arbre couvrant (Kruskal) tiré de (graine, bx, by) ;
+    - les blocs sont reliés par un arbre couvrant grossier calculable localement :
+      chaque bloc sauf (0, 0) s'ouvre vers son voisin du nord ou de l'ouest
+      (choix haché, comme un binary tree), par une porte de position hachée ;
+    - seuls les `max_blocks` blocs les plus récemment utilisés restent en mémoire.
+
+    Le labyrinthe ne dépend que de (n, block, seed) : un bloc évincé est
+    régénéré à l'identique. Les coordonnées sont celles de la grille texte
+    ((2n + 1) x (2n + 1), entrée (0, 1), sortie (2n, 2n - 1)), sans jamais la construire.
+    """
+
+    def __init__(self, n, block=DEFAULT_BLOCK, seed=None, max_blocks=DEFAULT_MAX_BLOCKS):
+        self.n = n
+        self.block = max(1, min(block, n))
+        self.blocks_per_side = -(-n // self.block)
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.max_blocks = max(1, max_blocks)
+        self.size = 2 * n + 1
+        self.entrance = (0, 1)
+        self.exit = (self.size - 1, self.size - 2)
+        self._blocks = OrderedDict()  # (bx, by) -> murs du bloc (uint8)
+        self.blocks_generated = 0
+
+    @property
+    def nbytes(self):
+        return sum(walls.nbytes for walls in self._blocks.values())
+
+    # --- arbre grossier entre blocs -------------------------------------------
+
+    def _block_extent(self, b):
+        """Nombre de cellules du bloc d'indice b le long d'un côté."""
+        return min(self.block, self.n - b * self.block)
+
+    def _parent_side(self, bx, by):
+        """Côté par lequel le bloc est relié à son parent : "north", "west" ou None (racine)."""
+        if bx == 0 and by == 0:
+            return None
+        if bx == 0:
+            return "west"
+        if by == 0:
+            return "north"
+        return "north" if _mix(self.seed, bx, by, 0) & 1 else "west"
+
+    def _door(self, bx, by):
+        """Position de la porte vers le parent, le long du bord partagé."""
+        side = self._parent_side(bx, by)
+        length = self._block_extent(by if side == "north" else bx)
+        return _mix(self.seed, bx, by, 1) % length
+
+    # --- blocs ------------------------------------------------------------------
+
+    def block_walls(self, bx, by):
+        """Murs EAST/SOUTH des cellules du bloc, portes vers les blocs est et sud
+        comprises (bords extérieurs fermés), générés au besoin."""
+        key = (bx, by)
+        walls = self._blocks.get(key)
+        if walls is not None:
+            self._blocks.move_to_end(key)
+            return walls
+        h, w = self._block_extent(bx), self._block_extent(by)
+        rng = np.random.default_rng([self.seed & _MASK64, bx, by])
+        codes, _, _ = kruskal_rect(h, w, rng)
+        walls = np.full((h, w), EAST | SOUTH, dtype=np.uint8)
+        rows, cols = np.divmod(codes >> 1, w)
+        south = (codes & 1).astype(bool)
+        walls[rows[~south], cols[~south]] &= ~EAST & 0xFF
+        walls[rows[south], cols[south]] &= ~SOUTH & 0xFF
+        # portes du bord est / sud : ouvertes par le bloc voisin s'il y est rattaché
+        if by + 1 < self.blocks_per_side and self._parent_side(bx, by + 1) == "west":
+            walls[self._door(bx, by + 1), w - 1] &= ~EAST & 0xFF
+        if bx + 1 < self.blocks_per_side and self._parent_side(bx + 1, by) == "north":
+            walls[h - 1, self._door(bx + 1, by)] &= ~SOUTH & 0xFF
+        self._blocks[key] = walls
+        self.blocks_generated += 1
+        if len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return walls
+
+    def cell_walls(self, row, col):
+        """Bits EAST/SOUTH de la cellule (row, col), portes entre blocs comprises."""
+        bx, rx = divmod(row, self.block)
+        by, ry = divmod(col, self.block)
+        return int(self.block_walls(bx, by)[rx, ry])
+
+    # --- interface grille texte ---------------------------------------------------
+
+    def is_open(self, x, y):
+        """Indique si la case (x, y) de la grille texte est un passage (cf. MazeGrid.is_open)."""
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return False
+        if (x, y) == self.entrance or (x, y) == self.exit:
+            return True
+        if x == 0 or y == 0 or x == self.size - 1 or y == self.size - 1:
+            return False
+        if x % 2 and y % 2:
+            return True
+        if x % 2:
+            return not self.cell_walls(x // 2, y // 2 - 1) & EAST
+        if y % 2:
+            return not self.cell_walls(x // 2 - 1, y // 2) & SOUTH
+        return False
+
+    def voisins(self, x, y):
+        """Voisins accessibles de (x, y), dans l'ordre de Solver._voisins."""
+        for dx, dy in ((0, 1), (1, 0), (-1, 0), (0, -1)):
+            if self.is_open(x + dx, y + dy):
+                yield x + dx, y + dy
+
+    def window(self, x0, y0, h, w):
+        """Extrait h x w (uint8) de la grille texte à partir de (x0, y0)."""
+        x1, y1 = min(x0 + h, self.size), min(y0 + w, self.size)
+        display = np.full((x1 - x0, y1 - y0), WALL, dtype=np.uint8)
+        for x in range(x0, x1):
+            for y in range(y0, y1):
+                if self.is_open(x, y):
+                    display[x - x0, y - y0] = OPEN
+        return display
+
+
+if __name__ == "__main__":
+    from mazes_solvers import Solver
+
+    parser = argparse.ArgumentParser(description="Résolution d'un labyrinthe virtuel généré à la demande")
+    parser.add_argument("n", type=int, help="taille du labyrinthe (n x n cellules)")
+    parser.add_argument("--block", type=int, default=DEFAULT_BLOCK, help="côté d'un bloc (cellules)")
+    parser.add_argument("--max-blocks", type=int, default=DEFAULT_MAX_BLOCKS, help="blocs gardés en mémoire")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--target", type=int, nargs=2, default=None, metavar=("LIGNE", "COLONNE"),
+                        help="case d'arrivée (grille texte), sortie par défaut")
+    args = parser.parse_args()
+
+    maze = VirtualMaze(args.n, block=args.block, seed=args.seed, max_blocks=args.max_blocks)
+    solver = Solver(maze, maze.entrance, tuple(args.target) if args.target else maze.exit)
+    _, chemin = solver.solve_generic()
+    if chemin is None:
+        print("Aucun chemin trouvé !")
+    else:
+        print(f"Chemin de {len(chemin)} cases, {maze.blocks_generated} bloc(s) générés "
+              f"({len(maze._blocks)} en mémoire, {maze.nbytes} octets)")
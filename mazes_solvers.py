@@ -1,170 +1,743 @@
+import functools
 import heapq # pour la file de priorité(trie par tas ici min-heap permet de d'acceder rapidemment au noeud avec le cout f(n) minimal)
+import os
+from array import array
+from contextlib import nullcontext
 from PIL import Image
+import numpy as np
 from solver_metric import SolverMetricsLogger
+from maze_grid import OPEN, as_display_array, display_open, display_opener, display_rows, load_display
+from maze_format import load_packed
+from maze_tree import MazeTree
+from maze_cli import script_options
+from maze_profile import attach_profiler
+# couleur de chaque symbole dans les images de solution
+COULEURS = {
+    "#": (0, 0, 0),
+    ".": (255, 255, 255),
+    "o": (0, 255, 0),
+    "*": (100, 100, 100),
+    "S": (0, 0, 255),
+    "E": (255, 0, 0)
+}
+# plafond de pixels par image (au-delà : pixel_size réduit puis tuiles)
+MAX_IMAGE_PIXELS = 50_000_000
+# rangées de la grille marquées à la fois (écriture et lecture d'une Solution)
+SOLUTION_ROW_BLOCK = 256
+# côté des tuiles d'état de solve_generic (coût et parent des cases atteintes)
+GENERIC_TILE = 256
+_DIRECTIONS = ((0, 1), (1, 0), (-1, 0), (0, -1))
+_FERME = 8  # bit « case fermée » de l'état, sous le code de direction (1 à 4)
+
+# symbole (octet) -> couleur RVB, blanc par défaut
+PALETTE = np.full((256, 3), 255, dtype=np.uint8)
+for _symbole, _couleur in COULEURS.items():
+    PALETTE[ord(_symbole)] = _couleur
+
+
+def render_image(grille, pixel_size=1):
+    """Image PIL d'une grille texte uint8 : palette puis agrandissement au plus proche voisin."""
+    img = Image.fromarray(PALETTE[grille])
+    if pixel_size > 1:
+        img = img.resize((grille.shape[1] * pixel_size, grille.shape[0] * pixel_size), Image.NEAREST)
+    return img
+
+class Solution:
+    """Labyrinthe résolu, marqué (o / * / S / E) à la lecture, par blocs de rangées.
+
+    Rien n'est copié à la résolution : la grille du solveur est partagée (jamais
+    modifiée) ou, pour un labyrinthe à bits de murs (MazeGrid, PackedMaze), ses
+    rangées sont décodées bloc par bloc à la lecture ; le chemin est gardé en indices à plat triés, les cases explorées
+    en masque (ou en indices triés). write() écrit la solution en flux ;
+    l'itération donne les lignes (str) comme l'ancienne liste de lignes.
+    """
+
+    def __init__(self, labyrinthe, chemin, explored, depart, sortie):
+        self.labyrinthe = labyrinthe  # grille texte uint8, ou MazeGrid / PackedMaze
+        if isinstance(labyrinthe, np.ndarray):
+            self.n, self.m = labyrinthe.shape
+        else:
+            self.n = self.m = labyrinthe.size
+        self.depart = depart
+        self.sortie = sortie
+        self.chemin = self._indices(chemin)
+        self.masque = None  # cases explorées : masque n x m (octets non nuls) ...
+        self.explores = None  # ... ou indices à plat triés
+        if isinstance(explored, (bytearray, np.ndarray)):
+            if isinstance(explored, bytearray):
+                explored = np.frombuffer(explored, dtype=np.uint8)
+            self.masque = explored.reshape(self.n, self.m)  # vue, sans copie
+        elif explored:
+            self.explores = self._indices(explored)
+
+    def _indices(self, cases):
+        if not cases:
+            return np.empty(0, dtype=np.intp)
+        xs, ys = np.array(list(cases), dtype=np.intp).T
+        indices = xs * self.m + ys
+        indices.sort()
+        return indices
+
+    def _extrait(self, indices, debut, fin):
+        """Indices de [debut, fin) (à plat), ramenés au début du bloc."""
+        bas, haut = np.searchsorted(indices, (debut, fin))
+        return indices[bas:haut] - debut
+
+    def _rangees(self, r0, r1):
+        """Copie des rangées [r0, r1) de la grille texte, à marquer."""
+        if isinstance(self.labyrinthe, np.ndarray):
+            return self.labyrinthe[r0:r1].copy()
+        return display_rows(self.labyrinthe, r0, r1)
+
+    def blocks(self, rangees=SOLUTION_ROW_BLOCK):
+        """Blocs de rangées marquées (uint8) ; seul le bloc courant est alloué."""
+        m = self.m
+        for r0 in range(0, self.n, rangees):
+            r1 = min(r0 + rangees, self.n)
+            bloc = self._rangees(r0, r1)
+            plat = bloc.reshape(-1)
+            if self.masque is not None:
+                plat[(self.masque[r0:r1].reshape(-1) != 0) & (plat == OPEN)] = ord('*')
+            elif self.explores is not None:
+                explores = self._extrait(self.explores, r0 * m, r1 * m)
+                plat[explores[plat[explores] == OPEN]] = ord('*')
+            plat[self._extrait(self.chemin, r0 * m, r1 * m)] = ord('o')
+            for (x, y), symbole in ((self.depart, 'S'), (self.sortie, 'E')):
+                if r0 <= x < r1:
+                    bloc[x - r0, y] = ord(symbole)
+            yield bloc
+
+    def text_blocks(self, rangees=SOLUTION_ROW_BLOCK):
+        """Blocs de texte (octets), une ligne terminée par \n par rangée."""
+        for bloc in self.blocks(rangees):
+            texte = np.empty((bloc.shape[0], self.m + 1), dtype=np.uint8)
+            texte[:, :-1] = bloc
+            texte[:, -1] = ord("\n")
+            yield texte.tobytes()
+
+    def write(self, f):
+        """Écrit la solution dans un fichier ouvert en binaire, bloc par bloc."""
+        for texte in self.text_blocks():
+            f.write(texte)
+
+    def tobytes(self):
+        return b"".join(self.text_blocks())
+
+    def to_display(self):
+        """Grille marquée complète (pour le rendu en image)."""
+        return np.concatenate(list(self.blocks())) if self.n else np.empty((0, self.m), dtype=np.uint8)
+
+    def __iter__(self):
+        for bloc in self.blocks():
+            for rangee in bloc:
+                yield rangee.tobytes().decode("ascii")
+
+    def __len__(self):
+        return self.n
+
+
+class _MasqueMurs:
+    """Masque à plat des cases libres de la grille bordée (cf. Solver._grille_bordee),
+    calculé à l'indexation depuis les bits de murs : rien n'est alloué d'avance."""
+
+    def __init__(self, murs, M):
+        self.murs = murs
+        self.M = M
+        self.size = (murs.size + 2) * M
+
+    def __getitem__(self, indices):
+        x, y = np.divmod(indices, self.M)
+        return display_open(self.murs, x - 1, y - 1)
+
+
+def _grille_requise(methode):
+    """Solveur qui parcourt la grille complète : refusé sur un labyrinthe virtuel."""
+    @functools.wraps(methode)
+    def verifie(self, *args, **kwargs):
+        if self.virtuel is not None:
+            raise ValueError(f"{methode.__name__} demande une grille complète : "
+                             "utiliser solve_generic sur un labyrinthe virtuel")
+        return methode(self, *args, **kwargs)
+    return verifie
+
+
 class Solver:
-    def __init__(self, labyrinthe, depart, sortie):
-        self.labyrinthe = [list(row) for row in labyrinthe]
-        self.n = len(labyrinthe)
-        self.m = len(labyrinthe[0])
+    def __init__(self, labyrinthe, depart, sortie, logger=None, show_explored=True):
+        if hasattr(labyrinthe, "voisins"):
+            # labyrinthe virtuel (VirtualMaze) : jamais matérialisé, voisins calculés à la demande
+            self.virtuel = labyrinthe
+            self.murs = None
+            self._grille = None
+            self.n = self.m = labyrinthe.size
+        elif hasattr(labyrinthe, "walls_rows"):
+            # bits de murs (MazeGrid, ou PackedMaze dont les murs restent en mmap) : dfs, astar,
+            # bfs et bidir les lisent directement, la grille texte n'est construite qu'au besoin
+            self.virtuel = None
+            self.murs = labyrinthe
+            self._grille = None
+            self.n = self.m = labyrinthe.size
+        else:
+            # grille texte en uint8 (1 octet par case) : accepte liste de str ou tableau
+            self.virtuel = None
+            self.murs = None
+            self._grille = as_display_array(labyrinthe)
+            self.n, self.m = self._grille.shape
         self.depart = depart
         self.sortie = sortie 
+        self.logger = logger  # SolverMetricsLogger (ou None : aucune mesure)
+        self.show_explored = show_explored  # False : cases explorées (*) non marquées
+        self._arbre = None  # MazeTree construit au premier tree_index(), réutilisé ensuite
+
+    @property
+    def labyrinthe(self):
+        """Grille texte uint8 ((2n+1)² octets), construite au premier accès depuis les
+        bits de murs ; None pour un labyrinthe virtuel."""
+        if self._grille is None and self.murs is not None:
+            self._grille = as_display_array(self.murs)
+        return self._grille
+
+    def _acces(self):
+        """(cases, ouvert) : vue à plat de la grille texte si elle existe (test
+        cases[i] == OPEN), sinon None et la fonction indice -> passage lue dans les murs."""
+        if self._grille is not None:
+            return memoryview(self._grille.reshape(-1)), None
+        return None, display_opener(self.murs)
 
     def _voisins(self, x, y):
         """Retourne les voisins accessibles (cases vides)."""
+        if self.virtuel is not None:
+            yield from self.virtuel.voisins(x, y)
+            return
+        cases, ouvert = self._acces()
         deplacements= [(0,1),(1,0),(-1,0),(0,-1)]
         for dx, dy in deplacements:
             nx, ny = x+dx, y+dy
-            if 0 <= nx < self.n and 0 <= ny < self.m and self.labyrinthe[nx][ny] == '.':
+            if 0 <= nx < self.n and 0 <= ny < self.m and (
+                    cases[nx*self.m + ny] == OPEN if cases is not None else ouvert(nx*self.m + ny)):
                 yield nx, ny    
     
+    def _phase(self, nom):
+        """Chronomètre une phase (search, path, mark, render) si un logger est actif."""
+        return self.logger.phase(nom) if self.logger else nullcontext()
+
     def _mark_solution(self, chemin, explored):
-        """Retourne une version du labyrinthe avec o/*/S/E marqués."""
-        lab_mod = [row[:] for row in self.labyrinthe]  
-        for (x, y) in explored:
-            if (x, y) not in chemin and lab_mod[x][y] == '.':
-                lab_mod[x][y] = '*'
-        for (x, y) in chemin:
-            lab_mod[x][y] = 'o'
-        lab_mod[self.depart[0]][self.depart[1]] = 'S'
-        lab_mod[self.sortie[0]][self.sortie[1]] = 'E'
-        return ["".join(row) for row in lab_mod]
-
-    #  DFS (backtracking récursif)
+        """Retourne la Solution (o/*/S/E marqués à la lecture, sans copie de la grille)."""
+        with self._phase("mark"):
+            grille = self._grille if self._grille is not None else self.murs
+            return Solution(grille, chemin, explored if self.show_explored else None,
+                            self.depart, self.sortie)
+
+    #  DFS (backtracking à pile explicite)
+    @_grille_requise
     def solve_dfs(self):
-        visited = set()
-        chemin = []
-        etat = {"sortie_trouvee": False}
-
-        def backtrack(x, y):
-            if etat["sortie_trouvee"]:
-                return
-            
-            visited.add((x, y))
-            chemin.append((x, y))
-
-            if logger:
-                logger.increment_nodes()  # chaque fois qu’on explore un nœud
-
-            if (x, y) == self.sortie:
-                etat["sortie_trouvee"] = True
-                return
-
-            for nx, ny in self._voisins(x, y):
-                if (nx, ny) not in visited:
-                    backtrack(nx, ny)
-                    if etat["sortie_trouvee"]:
-                        return
-
-            chemin.pop()
-
-        backtrack(*self.depart)
-        if not etat["sortie_trouvee"]:
+        """Même parcours que le backtracking récursif (mêmes chemin et cases explorées),
+        sans limite de récursion : la pile ne contient que des indices à plat."""
+        m = self.m
+        taille = self.n * m
+        cases, ouvert = self._acces()
+        visited = bytearray(taille)  # masque des cases explorées
+        depart = self.depart[0] * m + self.depart[1]
+        sortie = self.sortie[0] * m + self.sortie[1]
+
+        # pile = chemin courant ; directions[i] = prochaine direction à essayer
+        # pour pile[i], dans l'ordre (0,1), (1,0), (-1,0), (0,-1)
+        pile = array('q', [depart])
+        directions = bytearray([0])
+        visited[depart] = 1
+        explores = 1
+        trouve = depart == sortie
+
+        with self._phase("search"):
+            while pile and not trouve:
+                case = pile[-1]
+                d = directions[-1]
+                colonne = case % m
+                suivant = -1
+                while d < 4:
+                    if d == 0:
+                        voisin = case + 1 if colonne < m - 1 else -1
+                    elif d == 1:
+                        voisin = case + m if case + m < taille else -1
+                    elif d == 2:
+                        voisin = case - m
+                    else:
+                        voisin = case - 1 if colonne > 0 else -1
+                    d += 1
+                    if voisin >= 0 and not visited[voisin] and (
+                            cases[voisin] == OPEN if cases is not None else ouvert(voisin)):
+                        suivant = voisin
+                        break
+
+                if suivant < 0:
+                    pile.pop()
+                    directions.pop()
+                    continue
+
+                directions[-1] = d
+                visited[suivant] = 1
+                explores += 1
+                pile.append(suivant)
+                directions.append(0)
+                trouve = suivant == sortie
+
+        if self.logger:
+            self.logger.increment_nodes(explores)  # nœuds explorés, comptés localement
+        if not trouve:
             return None, None
+        with self._phase("path"):
+            chemin = [divmod(case, m) for case in pile]
+        if self.logger:
+            self.logger.set_path_length(len(chemin))
         return self._mark_solution(chemin, visited), chemin
 
+    #  A* générique (seulement via _voisins)
+    def solve_generic(self):
+        """A* qui n'accède au labyrinthe que par _voisins : fonctionne aussi sur un
+        labyrinthe virtuel, dont seuls les blocs traversés sont générés.
+
+        Le coût et le parent des cases atteintes sont gardés par tuiles de
+        GENERIC_TILE x GENERIC_TILE cases, allouées au premier passage (5 octets
+        par case d'une tuile touchée) : la mémoire croît avec la région explorée,
+        pas avec la taille du labyrinthe, mais n'est pas bornée pour autant.
+        Sur un labyrinthe virtuel, la grille marquée n'est pas construite
+        (retourne (None, chemin)) : utiliser VirtualMaze.window pour l'afficher.
+        """
+        depart, sortie = self.depart, self.sortie
+        sx, sy = sortie
+        T = GENERIC_TILE
+        tuiles = {}  # (tx, ty) -> (coût : array int32, -1 si non atteinte ; état : bytearray)
+
+        def tuile(x, y):
+            cle = (x // T, y // T)
+            t = tuiles.get(cle)
+            if t is None:
+                t = tuiles[cle] = (array("i", [-1]) * (T * T), bytearray(T * T))
+            return t
+
+        couts, _ = tuile(*depart)
+        couts[(depart[0] % T) * T + depart[1] % T] = 0
+        tas = [(abs(depart[0] - sx) + abs(depart[1] - sy), 0, depart)]
+        explores = 0
+        trouve = False
+
+        with self._phase("search"):
+            while tas:
+                _, cout, case = heapq.heappop(tas)
+                x, y = case
+                _, etats = tuile(x, y)
+                i = (x % T) * T + y % T
+                if etats[i] & _FERME:
+                    continue  # entrée périmée
+                etats[i] |= _FERME
+                explores += 1
+                if case == sortie:
+                    trouve = True
+                    break
+                nouveau = cout + 1
+                for voisin in self._voisins(x, y):
+                    vx, vy = voisin
+                    couts_v, etats_v = tuile(vx, vy)
+                    j = (vx % T) * T + vy % T
+                    # heuristique cohérente : une case fermée a déjà son coût minimal
+                    if etats_v[j] & _FERME or 0 <= couts_v[j] <= nouveau:
+                        continue
+                    couts_v[j] = nouveau
+                    etats_v[j] = _DIRECTIONS.index((vx - x, vy - y)) + 1
+                    heapq.heappush(tas, (nouveau + abs(vx - sx) + abs(vy - sy), nouveau, voisin))
+
+        if self.logger:
+            self.logger.increment_nodes(explores)
+        if not trouve:
+            return None, None
+        with self._phase("path"):
+            chemin = [sortie]
+            x, y = sortie
+            while (x, y) != depart:
+                _, etats = tuile(x, y)
+                dx, dy = _DIRECTIONS[(etats[(x % T) * T + y % T] & ~_FERME) - 1]
+                x, y = x - dx, y - dy
+                chemin.append((x, y))
+            chemin.reverse()
+        if self.logger:
+            self.logger.set_path_length(len(chemin))
+        if self.virtuel is not None:
+            return None, chemin
+        masque = None
+        if self.show_explored:
+            # cases fermées des tuiles, recopiées dans un masque de la grille
+            masque = np.zeros((self.n, self.m), dtype=np.uint8)
+            for (tx, ty), (_, etats) in tuiles.items():
+                fermes = np.frombuffer(etats, dtype=np.uint8).reshape(T, T) & _FERME
+                bloc = masque[tx * T:(tx + 1) * T, ty * T:(ty + 1) * T]
+                bloc[...] = fermes[:bloc.shape[0], :bloc.shape[1]]
+        return self._mark_solution(chemin, masque), chemin
+
     #  A* (plus court chemin)
+    @_grille_requise
     def solve_astar(self):
-        def heuristique(a, b):
-            return abs(a[0]-b[0]) + abs(a[1]-b[1])  # Manhattan
-
-        open_set = []
-        heapq.heappush(open_set, (0, self.depart))
-        parent = {}
-        cout_g = {self.depart: 0} # cout reel du chemin depuis le départ
-        cout_f = {self.depart: heuristique(self.depart, self.sortie)} # cout total estimé
-        explored = set()
-
-        # Initialisation
-        heapq.heappush(open_set, (cout_f[self.depart], self.depart))
-
-        while open_set:
-            _, case_courante = heapq.heappop(open_set) # cout_f est ignoré mais represente le cout total estimé et est utilisé pour le tri(min-heap pour prioriser les noeuds)
-            explored.add(case_courante)
-             #  chaque fois qu’on explore un nœud
-            if logger:
-                logger.increment_nodes()
-
-            if case_courante == self.sortie:
-                # Reconstruction du chemin
-                chemin = []
-                while case_courante in parent:
-                    chemin.append(case_courante)
-                    case_courante = parent[case_courante]
-                chemin.append(self.depart)
-                chemin = chemin[::-1]
-                if logger:
-                    logger.set_path_length(len(chemin))
-
-                return self._mark_solution(chemin, explored), chemin
-                
-
-            for voisin in self._voisins(*case_courante):
-                tentative_g = cout_g[case_courante] + 1
-                if tentative_g < cout_g.get(voisin, float('inf')):
-                    parent[voisin] = case_courante
-                    cout_g[voisin] = tentative_g
-                    cout_f[voisin] = tentative_g + heuristique(voisin, self.sortie)
-                    heapq.heappush(open_set, (cout_f[voisin], voisin))
-
-        return None, None
+        """A* sur indices à plat : g et parent dans des tableaux préalloués,
+        entrées périmées du tas ignorées (suppression paresseuse), égalités de f
+        départagées par h (le nœud le plus proche de la sortie d'abord)."""
+        m = self.m
+        taille = self.n * m
+        cases, ouvert = self._acces()
+        sx, sy = self.sortie
+        depart = self.depart[0] * m + self.depart[1]
+        sortie = sx * m + sy
+        n = self.n
+        decalages = (0, 1, m, -m, -1)
+        # (numéro de direction, dx, dy, décalage à plat) dans l'ordre de _voisins
+        directions = [(d, dx, dy, decalages[d]) for d, (dx, dy) in enumerate([(0, 1), (1, 0), (-1, 0), (0, -1)], start=1)]
+
+        cout_g = array('i', [-1]) * taille  # cout reel du chemin depuis le départ (-1 = jamais atteint)
+        parent = bytearray(taille)          # direction d'arrivée + 1 (0 = aucune)
+        ferme = bytearray(taille)           # cases déjà développées
+        cout_g[depart] = 0
+        h = abs(self.depart[0] - sx) + abs(self.depart[1] - sy)  # Manhattan
+        # clé du tas codée dans un seul entier (f, h, case) : comparaison plus
+        # rapide qu'entre tuples, même ordre lexicographique
+        echelle_h = taille
+        echelle_f = taille * (n + m)
+        open_set = [h * echelle_f + h * echelle_h + depart]
+        push, pop = heapq.heappush, heapq.heappop
+        explores = 0
+
+        trouve = False
+        with self._phase("search"):
+            while open_set:
+                case = pop(open_set) % echelle_h
+                if ferme[case]:
+                    continue  # entrée périmée
+                ferme[case] = 1
+                explores += 1
+                if case == sortie:
+                    trouve = True
+                    break
+
+                g = cout_g[case] + 1
+                x, y = divmod(case, m)
+                for d, dx, dy, decalage in directions:
+                    vx = x + dx
+                    vy = y + dy
+                    if not (0 <= vx < n and 0 <= vy < m):
+                        continue
+                    voisin = case + decalage
+                    if ferme[voisin] or not (cases[voisin] == OPEN if cases is not None else ouvert(voisin)):
+                        continue
+                    ancien = cout_g[voisin]
+                    if ancien < 0 or g < ancien:
+                        cout_g[voisin] = g
+                        parent[voisin] = d
+                        h = abs(vx - sx) + abs(vy - sy)
+                        push(open_set, (g + h) * echelle_f + h * echelle_h + voisin)
+
+        if self.logger:
+            self.logger.increment_nodes(explores)
+        if not trouve:
+            return None, None
+
+        # Reconstruction du chemin
+        with self._phase("path"):
+            chemin = []
+            while parent[case]:
+                chemin.append(divmod(case, m))
+                case -= decalages[parent[case]]
+            chemin.append(self.depart)
+            chemin.reverse()
+        if self.logger:
+            self.logger.set_path_length(len(chemin))
+        return self._mark_solution(chemin, ferme), chemin
     
-    def to_image(self, labyrinthe_solution, pixel_size=20, output_file="solution.jpg"):
-        n = len(labyrinthe_solution)
-        m = len(labyrinthe_solution[0])
-        img = Image.new("RGB", (m*pixel_size, n*pixel_size), "white")
-        pixels = img.load()
-
-        couleurs = {
-            "#": (0, 0, 0),
-            ".": (255, 255, 255),
-            "o": (0, 255, 0),
-            "*": (100, 100, 100),
-            "S": (0, 0, 255),
-            "E": (255, 0, 0)
-        }
-
-        for i, row in enumerate(labyrinthe_solution):
-            for j, cell in enumerate(row):
-                couleur = couleurs.get(cell, (255, 255, 255))
-                for dx in range(pixel_size):
-                    for dy in range(pixel_size):
-                        pixels[j*pixel_size + dx, i*pixel_size + dy] = couleur
-
-        img.save(output_file)
-        print(f"Image enregistrée sous {output_file}")
+    #  Outils communs aux solveurs vectorisés (NumPy)
+    def _grille_bordee(self, dense=False):
+        """Masque à plat des cases libres, entouré d'une bordure de murs : les
+        voisins d'une case sont alors toujours case ± 1 et case ± M, sans test de bornes.
+        Retourne (masque, M) où M est la largeur bordée.
+
+        Sans grille texte (bits de murs) et si dense est faux, le masque est lu
+        dans les murs à l'indexation (_MasqueMurs) au lieu d'être construit."""
+        M = self.m + 2
+        if not dense and self._grille is None and self.murs is not None:
+            return _MasqueMurs(self.murs, M), M
+        ouvert = np.zeros((self.n + 2, M), dtype=bool)
+        ouvert[1:-1, 1:-1] = self.labyrinthe == OPEN
+        return ouvert.reshape(-1), M
+
+    @staticmethod
+    def _indice_borde(case, M):
+        return (case[0] + 1) * M + case[1] + 1
+
+    def _interieur(self, masque, M):
+        """Partie n x m d'un masque à plat bordé."""
+        return masque.reshape(self.n + 2, M)[1:-1, 1:-1]
+
+    @staticmethod
+    def _etendre(frontiere, ouvert, vu, direction, decalages):
+        """Développe toute une frontière d'un coup : retourne les nouvelles cases,
+        marquées dans vu, avec direction[case] = indice du déplacement d'arrivée + 1."""
+        voisins = (frontiere[:, None] + decalages).reshape(-1)
+        sens = np.tile(np.arange(1, len(decalages) + 1, dtype=np.uint8), len(frontiere))
+        libres = ~vu[voisins]
+        libres[libres] = ouvert[voisins[libres]]  # murs lus seulement pour les cases non vues
+        voisins, premier = np.unique(voisins[libres], return_index=True)
+        direction[voisins] = sens[libres][premier]
+        vu[voisins] = True
+        return voisins
+
+    @staticmethod
+    def _remonter(case, direction, decalages):
+        """Indices bordés de la case jusqu'à l'origine de la recherche (incluse)."""
+        chemin = [case]
+        while direction[case]:
+            case -= decalages[direction[case] - 1]
+            chemin.append(case)
+        return chemin
+
+    #  BFS par frontières entières
+    @_grille_requise
+    def solve_bfs(self):
+        """Parcours en largeur dont chaque niveau est développé en une opération NumPy."""
+        ouvert, M = self._grille_bordee()
+        decalages = np.array([1, M, -M, -1])
+        depart = self._indice_borde(self.depart, M)
+        sortie = self._indice_borde(self.sortie, M)
+        vu = np.zeros(ouvert.size, dtype=bool)
+        direction = np.zeros(ouvert.size, dtype=np.uint8)
+        vu[depart] = True
+        frontiere = np.array([depart])
+        with self._phase("search"):
+            while frontiere.size and not vu[sortie]:
+                frontiere = self._etendre(frontiere, ouvert, vu, direction, decalages)
+
+        if self.logger:
+            self.logger.increment_nodes(int(vu.sum()))
+        if not vu[sortie]:
+            return None, None
+        with self._phase("path"):
+            chemin = [(c // M - 1, c % M - 1) for c in reversed(self._remonter(sortie, direction, decalages))]
+        if self.logger:
+            self.logger.set_path_length(len(chemin))
+        return self._mark_solution(chemin, self._interieur(vu, M)), chemin
+
+    #  BFS bidirectionnel
+    @_grille_requise
+    def solve_bidirectional(self):
+        """Deux BFS par frontières, depuis S et depuis E ; on développe toujours la
+        plus petite frontière et on s'arrête au premier niveau qui touche l'autre côté."""
+        ouvert, M = self._grille_bordee()
+        decalages = np.array([1, M, -M, -1])
+        depart = self._indice_borde(self.depart, M)
+        sortie = self._indice_borde(self.sortie, M)
+        cotes = []
+        for origine in (depart, sortie):
+            vu = np.zeros(ouvert.size, dtype=bool)
+            vu[origine] = True
+            cotes.append([np.array([origine]), vu, np.zeros(ouvert.size, dtype=np.uint8)])
+
+        rencontre = np.array([depart]) if depart == sortie else np.empty(0, dtype=np.intp)
+        with self._phase("search"):
+            while not rencontre.size and cotes[0][0].size and cotes[1][0].size:
+                actif = 0 if cotes[0][0].size <= cotes[1][0].size else 1
+                frontiere, vu, direction = cotes[actif]
+                frontiere = self._etendre(frontiere, ouvert, vu, direction, decalages)
+                cotes[actif][0] = frontiere
+                rencontre = frontiere[cotes[1 - actif][1][frontiere]]
+
+        if self.logger:
+            self.logger.increment_nodes(int(cotes[0][1].sum() + cotes[1][1].sum()))
+        if not rencontre.size:
+            return None, None
+        with self._phase("path"):
+            # toutes les rencontres ont la même distance côté actif : on garde
+            # celle dont la remontée côté passif est la plus courte
+            meilleur = None
+            for case in rencontre.tolist():
+                vers_depart = self._remonter(case, cotes[0][2], decalages)
+                vers_sortie = self._remonter(case, cotes[1][2], decalages)
+                if meilleur is None or len(vers_depart) + len(vers_sortie) < len(meilleur[0]) + len(meilleur[1]):
+                    meilleur = (vers_depart, vers_sortie)
+            vers_depart, vers_sortie = meilleur
+            chemin = [(c // M - 1, c % M - 1) for c in reversed(vers_depart)]
+            chemin += [(c // M - 1, c % M - 1) for c in vers_sortie[1:]]
+        if self.logger:
+            self.logger.set_path_length(len(chemin))
+        explored = self._interieur(cotes[0][1] | cotes[1][1], M)
+        return self._mark_solution(chemin, explored), chemin
+
+    #  Remplissage des culs-de-sac (labyrinthes parfaits)
+    @_grille_requise
+    def solve_dead_end(self):
+        """Bouche itérativement toutes les impasses (cases de degré 1) ; dans un
+        labyrinthe parfait il ne reste alors que le chemin de S à E.
+
+        Les degrés sont calculés en une fois avec NumPy, puis seuls les voisins
+        des cases bouchées au tour précédent sont réexaminés."""
+        with self._phase("search"):
+            ouvert, M = self._grille_bordee(dense=True)
+            grille = ouvert.reshape(self.n + 2, M)
+            degre = np.zeros(grille.shape, dtype=np.int8)
+            degre[1:-1, 1:-1] = (grille[:-2, 1:-1].astype(np.int8) + grille[2:, 1:-1]
+                                 + grille[1:-1, :-2] + grille[1:-1, 2:])
+            degre = degre.reshape(-1)
+            decalages = np.array([1, M, -M, -1])
+
+            protege = np.zeros_like(ouvert)
+            depart = self._indice_borde(self.depart, M)
+            sortie = self._indice_borde(self.sortie, M)
+            protege[[depart, sortie]] = True
+
+            initial = ouvert.copy()
+            frontiere = np.flatnonzero(ouvert & (degre <= 1) & ~protege)
+            while frontiere.size:
+                ouvert[frontiere] = False
+                voisins = (frontiere[:, None] + decalages).reshape(-1)
+                voisins = voisins[ouvert[voisins]]
+                np.subtract.at(degre, voisins, 1)
+                voisins = np.unique(voisins)
+                frontiere = voisins[(degre[voisins] <= 1) & ~protege[voisins]]
+
+            bouchees = self._interieur(initial & ~ouvert, M)
+
+        if self.logger:
+            self.logger.increment_nodes(int(bouchees.sum()))
+
+        with self._phase("path"):
+            # le chemin est ce qui reste : on le suit depuis le départ
+            chemin = [depart]
+            precedent = -1
+            case = depart
+            while case != sortie:
+                suivants = [case + d for d in (1, M, -M, -1) if ouvert[case + d] and case + d != precedent]
+                if not suivants:
+                    return None, None
+                precedent, case = case, suivants[0]
+                chemin.append(case)
+                if len(chemin) > ouvert.size:
+                    return None, None  # boucle : labyrinthe non parfait
+            chemin = [(c // M - 1, c % M - 1) for c in chemin]
+        if self.logger:
+            self.logger.set_path_length(len(chemin))
+        return self._mark_solution(chemin, bouchees), chemin
+
+    #  Requêtes de chemin sur l'arbre du labyrinthe
+    @_grille_requise
+    def tree_index(self):
+        """Index d'arbre enraciné au départ, construit au premier appel puis réutilisé."""
+        if self._arbre is None:
+            self._arbre = MazeTree(self.labyrinthe, self.depart)
+        return self._arbre
+
+    @_grille_requise
+    def solve_tree(self, depart=None, sortie=None):
+        """Chemin entre deux cases quelconques sans recherche (labyrinthes parfaits)."""
+        depart = depart or self.depart
+        sortie = sortie or self.sortie
+        with self._phase("search"):
+            arbre = self.tree_index()  # seul coût réel au premier appel
+        with self._phase("path"):
+            chemin = arbre.chemin(depart, sortie)
+        if chemin is None:
+            return None, None
+        if self.logger:
+            self.logger.increment_nodes(len(chemin))
+            self.logger.set_path_length(len(chemin))
+        return self._mark_solution(chemin, None), chemin
+
+    def to_image(self, labyrinthe_solution, pixel_size=20, output_file="solution.jpg", max_pixels=MAX_IMAGE_PIXELS):
+        """Rend la solution en image : palette appliquée à la grille uint8, agrandissement
+        au plus proche voisin par PIL, puis un seul enregistrement par fichier.
+
+        Si l'image dépasse max_pixels, pixel_size est réduit ; si elle le dépasse
+        encore à 1 px par case, elle est découpée en tuiles numérotées.
+        Retourne la liste des fichiers écrits."""
+        with self._phase("render"):
+            grille = as_display_array(labyrinthe_solution)
+            n, m = grille.shape
+
+            taille_max = max(1, int((max_pixels / (n * m)) ** 0.5))
+            if pixel_size > taille_max:
+                print(f"Image trop grande : pixel_size réduit de {pixel_size} à {taille_max}")
+                pixel_size = taille_max
+
+            # découpage seulement si l'image entière dépasse max_pixels ;
+            # chaque tuile carrée de côté `cote` cases tient alors dans max_pixels
+            if n * m * pixel_size ** 2 <= max_pixels:
+                cote = max(n, m)
+            else:
+                cote = max(1, int(max_pixels ** 0.5) // pixel_size)
+            tuiles = [(i, j) for i in range(0, n, cote) for j in range(0, m, cote)]
+
+            fichiers = []
+            racine, extension = os.path.splitext(output_file)
+            for i, j in tuiles:
+                img = render_image(grille[i:i + cote, j:j + cote], pixel_size)
+                nom = output_file if len(tuiles) == 1 else f"{racine}_{i // cote}_{j // cote}{extension}"
+                img.save(nom)
+                fichiers.append(nom)
+
+            if len(fichiers) == 1:
+                print(f"Image enregistrée sous {output_file}")
+            else:
+                print(f"Image découpée en {len(fichiers)} tuiles {racine}_<ligne>_<colonne>{extension}")
+            return fichiers
+
+
+# nom du solveur (CLI, métriques) -> méthode de Solver
+SOLVEURS = {
+    "dfs": "solve_dfs",
+    "astar": "solve_astar",
+    "bfs": "solve_bfs",
+    "bidir": "solve_bidirectional",
+    "deadend": "solve_dead_end",
+    "tree": "solve_tree",
+    "generic": "solve_generic",
+}
 
 
 #  Exemple d’utilisation
 if __name__ == "__main__":
-    input_file = input("Nom du fichier contenant le labyrinthe : ")
-    with open(input_file, "r") as f:
-        labyrinthe = [line.strip() for line in f.readlines()]
+    input_file = input("Nom du fichier contenant le labyrinthe (ou algorithme:taille:seed) : ")
+    spec = input_file.split(":")
+    if not os.path.exists(input_file) and len(spec) == 3:
+        # labyrinthe repris du cache (généré puis mis en cache s'il n'y est pas)
+        from maze_cache import MazeCache
+        algorithme, taille, graine = spec
+        labyrinthe = MazeCache().get_or_generate(algorithme, int(taille), int(graine))
+        depart, sortie = labyrinthe.entrance, labyrinthe.exit
+        input_file = f"{algorithme}_{taille}_{graine}.maze"
+    elif input_file.endswith(".maze"):
+        # format binaire : murs en mmap, entrée/sortie lues dans l'en-tête
+        # (dfs, astar, bfs, bidir et generic lisent les bits de murs ; la grille
+        # texte complète, (2n+1)² octets, n'est construite que pour deadend, tree et l'image)
+        labyrinthe = load_packed(input_file)
+        depart, sortie = labyrinthe.entrance, labyrinthe.exit
+    else:
+        labyrinthe = load_display(input_file)
         n = (len(labyrinthe) - 1) // 2
         depart = (0, 1)
         sortie = (2*n, 2*n - 1)
 
-    solver = Solver(labyrinthe, depart, sortie)
+    options = script_options()
     logger = SolverMetricsLogger()
+    # --no-explored : seul le chemin est marqué (pas de *)
+    solver = Solver(labyrinthe, depart, sortie, logger=logger, show_explored=not options.no_explored)
 
-    choix = input("Choisir un solveur (dfs / astar) : ").strip().lower()
+    choix = input(f"Choisir un solveur ({' / '.join(SOLVEURS)}) : ").strip().lower()
+    # --profile [sample|cprofile] : résolution et rendu profilés, profil écrit à côté de la solution
+    attach_profiler(options.profile, logger, solver, SOLVEURS.get(choix, "solve_astar"), "to_image")
     logger.start(maze_name= input_file, maze_size=f"{solver.n}x{solver.m}", algorithm=choix)
 
-    if choix == "dfs":
-        solution, chemin = solver.solve_dfs()
-    else:
-        solution, chemin = solver.solve_astar()
+    solution, chemin = getattr(solver, SOLVEURS.get(choix, "solve_astar"))()
+    logger.end_timing()  # écriture et rendu mesurés à part (phases io et render)
 
     if solution:
-        output_file = f"solution_{choix}_{input_file}"
-        with open(output_file, "w") as f:
-            for ligne in solution:
-                f.write(ligne + "\n")
-        solver.to_image(solution, output_file=output_file.replace(".txt", ".jpg"))
-
-        # enregistrement métriques
-        logger.increment_nodes()  # à adapter -> tu peux incrémenter dans tes solveurs
-        if chemin:
-            logger.set_path_length(len(chemin))
+        output_file = f"solution_{choix}_{os.path.splitext(input_file)[0]}.txt"
+        with logger.phase("io"):
+            with open(output_file, "wb") as f:
+                solution.write(f)  # rangées marquées et écrites bloc par bloc
+        solver.to_image(solution, output_file=os.path.splitext(output_file)[0] + ".jpg")
+
+        # enregistrement métriques (nœuds et longueur du chemin comptés par le solveur)
         logger.stop(output_file)
         logger.print_metrics()
 
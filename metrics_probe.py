@@ -0,0 +1,129 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+import psutil
+
+# Outils de mesure partagés par MetricsLogger et SolverMetricsLogger
+
+RSS_INTERVAL = 0.005  # période d'échantillonnage de la RSS (s)
+MB = 1024 * 1024
+
+# Niveaux de comptage des événements (arêtes, retours arrière, nœuds...) :
+#   off      : aucun compteur, colonnes laissées vides
+#   summary  : comptes analytiques ou cumulés localement, transmis une fois
+#   detailed : comptes événement par événement (ex. niveaux de find de l'union-find)
+METRICS_LEVELS = ("off", "summary", "detailed")
+DEFAULT_LEVEL = "summary"
+
+
+def check_level(level):
+    if level not in METRICS_LEVELS:
+        raise ValueError(f"Niveau de métriques inconnu : {level} (choix : {', '.join(METRICS_LEVELS)})")
+    return level
+
+
+class RssSampler:
+    """Pic de RSS entre start() et stop(), relevé par un thread de fond.
+
+    Une lecture au début et une à la fin ne voient pas les allocations
+    temporaires libérées entre les deux : le thread échantillonne la RSS
+    toutes les `interval` secondes et garde le maximum.
+    """
+
+    def __init__(self, interval=RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+        self._thread = None
+        try:
+            self._process = psutil.Process()
+        except psutil.Error:
+            self._process = None
+
+    def _sample(self):
+        try:
+            rss = self._process.memory_info().rss
+        except (psutil.Error, AttributeError):
+            return
+        if rss > self.peak:
+            self.peak = rss
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.stop()
+        self.peak = 0
+        self._done.clear()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'échantillonnage et retourne le pic en Mo."""
+        if self._thread is not None:
+            self._done.set()
+            self._thread.join()
+            self._thread = None
+        self._sample()
+        return self.peak / MB
+
+
+class AllocationTracker:
+    """Pic des allocations Python (tracemalloc) entre start() et stop().
+
+    tracemalloc ralentit fortement le code Python : à n'activer que pour
+    comparer les allocations, pas pour mesurer les temps.
+    """
+
+    def __init__(self):
+        self._owner = False
+
+    def start(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()  # déjà actif (ex. appelant) : on ne l'arrête pas
+            self._owner = False
+        else:
+            tracemalloc.start()
+            self._owner = True
+
+    def stop(self):
+        """Retourne le pic en Mo (0 si le suivi n'est pas actif)."""
+        if not tracemalloc.is_tracing():
+            return 0
+        _, peak = tracemalloc.get_traced_memory()
+        if self._owner:
+            tracemalloc.stop()
+            self._owner = False
+        return peak / MB
+
+
+class PhaseTimer:
+    """Durées cumulées (ms) de phases nommées, mesurées par `with timer.phase(nom):`."""
+
+    def __init__(self):
+        self.durations = {}
+
+    def reset(self):
+        self.durations = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name, ms):
+        self.durations[name] = self.durations.get(name, 0.0) + ms
+
+    def get(self, name):
+        return self.durations.get(name, 0.0)
+
+
+def phase_columns(phases):
+    return [f"phase_{name}_ms" for name in phases]
+
@@ -1,47 +1,73 @@
-import csv
 import os
 import time
-import psutil # enregistrement de l'empreinte mémoire
 from datetime import datetime
+from metrics_probe import DEFAULT_LEVEL, RSS_INTERVAL, AllocationTracker, check_level, PhaseTimer, RssSampler, phase_columns
+from metrics_sink import DEFAULT_BATCH, open_sink
 
 class MetricsLogger:
 # centralise l'écriture des métriques
 # garde l'empreinte temporaire entre start et stop
 
-    def __init__(self, csv_file="kruskal_strict.csv"):
-        self.csv_file = csv_file
+    # phases chronométrées, une colonne phase_<nom>_ms chacune
+    PHASES = ("edges", "shuffle", "union_find", "carve", "io")
+
+    # noms des colonnes 
+    COLUMNS = [
+        "timestamp", "filename", "maze_size", "seed", "algorithm",
+        "generation_time_ms", "ram_peak_mb", "file_size_bytes",
+        "backtrack_count", "edges_processed", "union_find_operations", "metrics_level"
+    ] + phase_columns(PHASES) + ["py_alloc_peak_mb", "tile_count", "tile_time_mean_ms", "tile_time_max_ms", "profile_file"] + [
+        # analyse de structure (maze_analytics, optionnelle)
+        "dead_ends", "corridor_cells", "junctions_3", "junctions_4", "max_distance", "mean_distance",
+        "diameter", "solution_length", "tortuosity", "analytics_time_ms"
+    ]
+    # types pour les backends Parquet / DuckDB (les autres colonnes sont des flottants)
+    COLUMN_TYPES = {
+        "timestamp": "text", "filename": "text", "algorithm": "text", "metrics_level": "text",
+        "maze_size": "int", "seed": "int", "file_size_bytes": "int",
+        "backtrack_count": "int", "edges_processed": "int", "union_find_operations": "int", "tile_count": "int", "profile_file": "text",
+        "dead_ends": "int", "corridor_cells": "int", "junctions_3": "int", "junctions_4": "int",
+        "max_distance": "int", "diameter": "int", "solution_length": "int",
+    }
+    TABLE = "constructors_metrics" # table DuckDB
+
+    def __init__(self, csv_file="kruskal_strict.csv", trace_allocations=False, rss_interval=RSS_INTERVAL, level=DEFAULT_LEVEL,
+                 batch_size=1):
+        self.csv_file = csv_file # .csv, .parquet (répertoire) ou .duckdb ; None => rien n'est enregistré
+        self.batch_size = batch_size # 1 : ligne écrite à stop() ; > 1 : lignes gardées en mémoire, écriture groupée
+        self.level = check_level(level) # off / summary / detailed (cf. metrics_probe)
+        self.counting = level != "off" # les générateurs ne comptent rien si False
+        self.detailed = level == "detailed" # comptes événement par événement
         self.start_time  = None
-        self.initial_memory = None
+        self.end_time = None
+        self.trace_allocations = trace_allocations # pic des allocations Python (tracemalloc, lent)
+        self.memory = RssSampler(rss_interval) # pic de RSS relevé en continu entre start et stop
+        self.allocations = AllocationTracker()
+        self.phases = PhaseTimer()
+        self.profiler = None # maze_profile.Profiler (--profile) : profil écrit à stop(), à côté du fichier
+        self.analytics = None # fonction -> colonnes d'analyse (maze_analytics), appelée à stop() après les mesures
         self .backtrack_count = 0
         self.edges_processed = 0
         self.current_metrics = {} # disctionnaire temporaire 
                                  # servant de dépot avant record to csv
+        self.columns = list(self.COLUMNS)
+        self.sink = self.open_sink(csv_file, batch_size) if csv_file is not None else None
 
-        # noms des colonnes 
-        self.columns = [
-            "timestamp", "filename", "maze_size", "seed", "algorithm",
-            "generation_time_ms", "ram_peak_mb", "file_size_bytes",
-            "backtrack_count", "edges_processed", "union_find_operations" 
-        ]
-
-        self._init_csv() 
-
-    def _init_csv(self): # création de l'en-tête si fichier non existant
-        if not os.path.exists(self.csv_file):
-            with open(self.csv_file, 'w', newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(self.columns) # prends la valeur de la liste de la variable self.columns
+    @classmethod
+    def open_sink(cls, path, batch_size=DEFAULT_BATCH):
+        # destination des lignes (CSV créé ou mis à jour au premier lot écrit)
+        return open_sink(path, cls.COLUMNS, types=cls.COLUMN_TYPES, table=cls.TABLE, batch_size=batch_size)
 
     # Début de la prise des métriques
     def start(self, maze_size, algorithm, seed=None):
+        self.memory.start() # RSS en Mo : ex. 50 mo => rss = 50 x 1024 x 1024 = 52428800, divisé par (1024 x 1024)
+        if self.trace_allocations:
+            self.allocations.start()
+        self.phases.reset()
+        self.end_time = None
+        self._io_before_end = 0.0
+        self.tile_times = [] # durées par tuile (génération par tuiles uniquement)
         self.start_time = time.perf_counter() # lancement du chrono
-        try:
-            self.initial_memory = psutil.Process().memory_info().rss / (1024 * 1024) # quantité de RAM occupé au moment précis
-                                                                                     # où on appelle cette methode
-                                                                                     # ex : 50 mo => rss =  50 x 1024 x 1024 = 52428800
-                                                                                     # on divise par (1024 x 1024) pour une mailleure lecture
-        except:
-            self.initial_memory = 0
 
         self .backtrack_count = 0
         self.edges_processed = 0
@@ -55,27 +81,37 @@ class MetricsLogger:
         }
 
 
-    def increment_edge(self):
-        self.edges_processed += 1
+    def increment_edge(self, count=1):
+        self.edges_processed += count
 
-    def increment_backtrack(self):
-        self.backtrack_count += 1
+    def increment_backtrack(self, count=1):
+        self.backtrack_count += count
+
+    def increment_union_find_op(self, count=1):
+        self.union_find_operations += count
+
+    def record_tiles(self, times_ms): # une durée (ms) par tuile, mesurée dans son processus
+        self.tile_times.extend(times_ms)
+
+    def phase(self, name): # with logger.phase("carve"): ... => durée ajoutée à phase_carve_ms
+        return self.phases.phase(name)
+
+    def end_timing(self):
+        # fin de la génération : ce qui suit (écriture, affichage) n'entre pas dans generation_time_ms
+        if self.start_time is not None and self.end_time is None:
+            self.end_time = time.perf_counter()
+            self._io_before_end = self.phases.get("io")
 
-    def increment_union_find_op(self):
-        self.union_find_operations += 1
-        
     def stop(self, filename):
         if self.start_time is None:
             raise RuntimeError ("MetricsLogger.stop() appelé avant start()") # on lève une erreur si la méthode start() n'a pas été lancé avant
         
-        # estimation de l'empreinte mémoire utilisée
-        generation_time = (time.perf_counter() - self.start_time) * 1000 # calcul du temps écoulé stop - start en ms
-
-        try: 
-            final_memory = psutil.Process().memory_info().rss / (1024 * 1024)
-            peak_memory = max(self.initial_memory, final_memory)
-        except:
-            peak_memory = 0
+        self.end_timing() # sans appel explicite, le chrono s'arrête ici
+        # temps écoulé start -> fin de génération en ms, hors écritures de fichier
+        generation_time = (self.end_time - self.start_time) * 1000 - self._io_before_end
+
+        peak_memory = self.memory.stop() # vrai pic de RSS sur toute la mesure
+        alloc_peak = self.allocations.stop() if self.trace_allocations else None
         
         # impact stockage
         file_size = os.path.getsize(filename) if os.path.exists(filename) else 0 # récupère la taille en octets et récupère sa taille en octets
@@ -86,18 +122,35 @@ class MetricsLogger:
             "generation_time_ms": round(generation_time,2),
             "ram_peak_mb": round(peak_memory, 2),
             "file_size_bytes": file_size,
-            "backtrack_count": self.backtrack_count,
-            "edges_processed": self.edges_processed,
-            "union_find_operations": self.union_find_operations
+            # compteurs vides si level="off"
+            "backtrack_count": self.backtrack_count if self.counting else "",
+            "edges_processed": self.edges_processed if self.counting else "",
+            "union_find_operations": self.union_find_operations if self.counting else "",
+            "metrics_level": self.level,
+            "py_alloc_peak_mb": round(alloc_peak, 2) if alloc_peak is not None else "",
+            # colonnes vides hors génération par tuiles
+            "tile_count": len(self.tile_times) if self.tile_times else "",
+            "tile_time_mean_ms": round(sum(self.tile_times) / len(self.tile_times), 2) if self.tile_times else "",
+            "tile_time_max_ms": round(max(self.tile_times), 2) if self.tile_times else "",
+            "profile_file": os.path.basename(self.profiler.save(filename)) if self.profiler is not None else ""
         })
-
-        # enregistrement dans les csv
-        with open(self.csv_file, "a", newline="", encoding= "utf-8") as f:  # ouverture du csv en mode append
-            writer = csv.writer(f)  # préparation de l'écriture au foramt csv
-            row = [self.current_metrics[col] for col in self.columns] # construit la ligne suivant self.columns
-            writer.writerow(row) # ajoute la ligne au csv
+        for name in self.PHASES:
+            self.current_metrics[f"phase_{name}_ms"] = round(self.phases.get(name), 2)
+        if self.analytics is not None:
+            # hors temps et pic de RSS : la RSS n'est plus relevée à ce stade
+            self.current_metrics.update(self.analytics())
+
+        # mise en tampon de la ligne (csv_file=None : mesures non enregistrées, ex. échauffement)
+        # écrite tout de suite (batch_size=1, défaut) ou par lots de batch_size,
+        # au plus tard à flush() ou à la fin du programme
+        if self.sink is not None:
+            self.sink.write({col: self.current_metrics.get(col, "") for col in self.columns})
 
         self.start_time = None # remise de start à None => on peut relancer un nouveau test
+
+    def flush(self): # écrit tout de suite les lignes en attente
+        if self.sink is not None:
+            self.sink.flush()
     
     # impression en cosole des métriques relevées
     def print_metrics(self):
@@ -0,0 +1,246 @@
+import abc
+import atexit
+import csv
+import os
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Lignes de métriques gardées en mémoire avant écriture groupée
+DEFAULT_BATCH = 32
+BACKENDS = ("csv", "parquet", "duckdb")
+
+# types de colonnes : "text", "int" ou "float" (défaut)
+_DUCKDB_TYPES = {"text": "VARCHAR", "int": "BIGINT", "float": "DOUBLE"}
+
+# sinks ayant des lignes en attente, vidés à la sortie du programme ; la référence
+# est forte : un logger hors de portée ne perd pas ses lignes en tampon
+_PENDING = set()
+
+
+@contextmanager
+def file_lock(path):
+    """Verrou exclusif entre processus, porté par le fichier path + ".lock"."""
+    with open(path + ".lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK abandonne après 10 s : on réessaie
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def ensure_csv_header(csv_file, columns):
+    """Crée le CSV avec son en-tête, ou met à jour celui d'une version antérieure.
+
+    Un fichier existant dont l'en-tête diffère est réécrit avec les nouvelles
+    colonnes (vides pour les lignes déjà présentes) ; ses colonnes inconnues
+    sont conservées en fin de ligne. Retourne les colonnes à écrire.
+    """
+    if not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0:
+        with open(csv_file, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(columns)
+        return columns
+
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    columns = columns + [col for col in header if col not in columns]
+    if header == columns:
+        return columns
+
+    tmp_file = f"{csv_file}.{os.getpid()}.tmp"
+    with open(csv_file, newline="", encoding="utf-8") as src, \
+            open(tmp_file, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.reader(src)
+        next(reader, None)
+        writer = csv.writer(dst)
+        writer.writerow(columns)
+        for row in reader:
+            values = dict(zip(header, row))
+            writer.writerow([values.get(col, "") for col in columns])
+    os.replace(tmp_file, csv_file)
+    return columns
+
+
+class MetricsSink(abc.ABC):
+    """Destination des lignes de métriques : tampon en mémoire, écriture par lots.
+
+    Chaque lot est écrit sous un verrou de fichier, plusieurs processus peuvent
+    donc alimenter la même destination. Les lignes sont des dictionnaires
+    colonne -> valeur ; "" ou None désignent une valeur absente.
+    """
+
+    backend = None
+
+    def __init__(self, path, columns, types=None, table="metrics", batch_size=DEFAULT_BATCH):
+        self.path = path
+        self.columns = list(columns)
+        self.types = types or {}
+        self.table = table
+        self.batch_size = max(1, batch_size)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        _PENDING.add(self)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        _PENDING.discard(self)
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        with file_lock(self.path):
+            self._write(rows)
+
+    @abc.abstractmethod
+    def _write(self, rows):
+        """Écrit un lot de lignes (appelé sous le verrou de fichier)."""
+
+    def _typed(self, column, value):
+        if value is None or value == "":
+            return None
+        kind = self.types.get(column, "float")
+        if kind == "text":
+            return str(value)
+        return int(value) if kind == "int" else float(value)
+
+
+class CsvSink(MetricsSink):
+    backend = "csv"
+
+    def _write(self, rows):
+        # en-tête vérifié sous le verrou : un autre processus a pu créer ou migrer le fichier
+        self.columns = ensure_csv_header(self.path, self.columns)
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for row in rows:
+                writer.writerow(["" if row.get(col) is None else row.get(col, "") for col in self.columns])
+
+
+class ParquetSink(MetricsSink):
+    """Un fichier Parquet par lot dans le répertoire path.
+
+    Chaque fichier a les colonnes de sa version du logger : le lire d'un bloc
+    avec read_metrics (schéma unifié) ou DuckDB read_parquet('path/*.parquet',
+    union_by_name=true), pas pandas.read_parquet (schéma du premier fichier).
+    """
+
+    backend = "parquet"
+
+    def _write(self, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_types = {"text": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        schema = pa.schema([(col, arrow_types[self.types.get(col, "float")]) for col in self.columns])
+        data = {col: [self._typed(col, row.get(col)) for row in rows] for col in self.columns}
+        os.makedirs(self.path, exist_ok=True)
+        name = os.path.join(self.path, f"part-{time.time_ns()}-{os.getpid()}.parquet")
+        pq.write_table(pa.table(data, schema=schema), name + ".tmp")
+        os.replace(name + ".tmp", name)  # jamais de fichier partiel visible
+
+
+class DuckDBSink(MetricsSink):
+    """Table `table` d'une base DuckDB (un seul processus écrivain à la fois : le verrou)."""
+
+    backend = "duckdb"
+
+    def _write(self, rows):
+        import duckdb
+
+        con = duckdb.connect(self.path)
+        try:
+            columns_sql = ", ".join(f'"{col}" {_DUCKDB_TYPES[self.types.get(col, "float")]}' for col in self.columns)
+            con.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns_sql})')
+            existing = {name for name, *_ in con.execute(f'DESCRIBE "{self.table}"').fetchall()}
+            for col in self.columns:
+                if col not in existing:
+                    con.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{col}" {_DUCKDB_TYPES[self.types.get(col, "float")]}')
+            names = ", ".join(f'"{col}"' for col in self.columns)
+            marks = ", ".join("?" for _ in self.columns)
+            con.executemany(f'INSERT INTO "{self.table}" ({names}) VALUES ({marks})',
+                            [[self._typed(col, row.get(col)) for col in self.columns] for row in rows])
+        finally:
+            con.close()
+
+
+_SINK_CLASSES = {"csv": CsvSink, "parquet": ParquetSink, "duckdb": DuckDBSink}
+
+
+def backend_for(path):
+    """Backend déduit de l'extension : .parquet, .duckdb / .db, sinon CSV."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return "parquet"
+    if ext in (".duckdb", ".db"):
+        return "duckdb"
+    return "csv"
+
+
+def open_sink(path, columns, types=None, table="metrics", batch_size=DEFAULT_BATCH, backend=None):
+    backend = backend or backend_for(path)
+    if backend not in _SINK_CLASSES:
+        raise ValueError(f"Backend de métriques inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+    return _SINK_CLASSES[backend](path, columns, types=types, table=table, batch_size=batch_size)
+
+
+def read_metrics(path, table=None):
+    """Charge toutes les métriques d'une destination dans un DataFrame pandas.
+
+    Parquet : les fichiers de lots sont lus avec le schéma unifié de tous les
+    lots (colonnes ajoutées par une version ultérieure vides dans les anciens).
+    DuckDB : `table` peut être omis si la base ne contient qu'une table.
+    """
+    import pandas as pd
+
+    backend = backend_for(path)
+    if backend == "parquet":
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".parquet"))
+        if not files:
+            return pd.DataFrame()
+        schema = pa.unify_schemas([pq.read_schema(name) for name in files])
+        return ds.dataset(files, schema=schema, format="parquet").to_table().to_pandas()
+    if backend == "duckdb":
+        import duckdb
+
+        con = duckdb.connect(path, read_only=True)
+        try:
+            if table is None:
+                tables = [name for (name,) in con.execute("SHOW TABLES").fetchall()]
+                if len(tables) != 1:
+                    raise ValueError(f"{path} contient {len(tables)} tables ({', '.join(tables)}) : préciser table=")
+                table = tables[0]
+            return con.execute(f'SELECT * FROM "{table}"').df()
+        finally:
+            con.close()
+    return pd.read_csv(path)
+
+
+@atexit.register
+def _flush_all():
+    for sink in list(_PENDING):
+        sink.flush()
@@ -1,39 +1,56 @@
-import csv
 import os
 import time
-import psutil
 from datetime import datetime
+from metrics_probe import DEFAULT_LEVEL, RSS_INTERVAL, AllocationTracker, check_level, PhaseTimer, RssSampler, phase_columns
+from metrics_sink import DEFAULT_BATCH, open_sink
 
 class SolverMetricsLogger:
-    def __init__(self, csv_file="solver_metrics.csv"):
+    # phases chronométrées, une colonne phase_<nom>_ms chacune
+    PHASES = ("search", "path", "mark", "render", "io")
+
+    # colonnes adaptées au solveur
+    COLUMNS = [
+        "timestamp","maze_name", "maze_size", "algorithm",
+        "solve_time_ms", "ram_peak_mb", "file_size_bytes",
+        "nodes_explored", "path_length", "metrics_level"
+    ] + phase_columns(PHASES) + ["py_alloc_peak_mb", "profile_file"]
+    COLUMN_TYPES = {
+        "timestamp": "text", "maze_name": "text", "maze_size": "text", "algorithm": "text", "metrics_level": "text",
+        "file_size_bytes": "int", "nodes_explored": "int", "path_length": "int", "profile_file": "text",
+    }
+    TABLE = "solver_metrics"
+
+    def __init__(self, csv_file="solver_metrics.csv", trace_allocations=False, rss_interval=RSS_INTERVAL, level=DEFAULT_LEVEL,
+                 batch_size=1):
         self.csv_file = csv_file
+        self.level = check_level(level)
+        self.counting = level != "off"
+        self.detailed = level == "detailed"
         self.start_time = None
-        self.initial_memory = None
+        self.end_time = None
+        self.trace_allocations = trace_allocations
+        self.memory = RssSampler(rss_interval)
+        self.allocations = AllocationTracker()
+        self.phases = PhaseTimer()
+        self.profiler = None  # maze_profile.Profiler (--profile) : profil écrit à stop(), à côté du fichier
         self.nodes_explored = 0
         self.path_length = 0
         self.current_metrics = {}
+        self.columns = list(self.COLUMNS)
+        self.sink = self.open_sink(csv_file, batch_size) if csv_file is not None else None
 
-        # colonnes adaptées au solveur
-        self.columns = [
-            "timestamp","maze_name", "maze_size", "algorithm",
-            "solve_time_ms", "ram_peak_mb", "file_size_bytes",
-            "nodes_explored", "path_length"
-        ]
-
-        self._init_csv()
-
-    def _init_csv(self):
-        if not os.path.exists(self.csv_file):
-            with open(self.csv_file, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(self.columns)
+    @classmethod
+    def open_sink(cls, path, batch_size=DEFAULT_BATCH):
+        return open_sink(path, cls.COLUMNS, types=cls.COLUMN_TYPES, table=cls.TABLE, batch_size=batch_size)
 
     def start(self, maze_name, maze_size, algorithm):
+        self.memory.start()
+        if self.trace_allocations:
+            self.allocations.start()
+        self.phases.reset()
+        self.end_time = None
+        self._io_before_end = 0.0
         self.start_time = time.perf_counter()
-        try:
-            self.initial_memory = psutil.Process().memory_info().rss / (1024 * 1024)
-        except:
-            self.initial_memory = 0
 
         self.nodes_explored = 0
         self.path_length = 0
@@ -46,23 +63,30 @@ class SolverMetricsLogger:
             
         }
 
-    def increment_nodes(self):
-        self.nodes_explored += 1
+    def increment_nodes(self, count=1):
+        self.nodes_explored += count
 
     def set_path_length(self, length):
         self.path_length = length
 
+    def phase(self, name):
+        return self.phases.phase(name)
+
+    def end_timing(self):
+        """Fin de la résolution : rendu, écriture et affichage qui suivent sont hors solve_time_ms."""
+        if self.start_time is not None and self.end_time is None:
+            self.end_time = time.perf_counter()
+            self._io_before_end = self.phases.get("io")
+
     def stop(self, filename):
         if self.start_time is None:
             raise RuntimeError("SolverMetricsLogger.stop() appelé avant start()")
 
-        solve_time = (time.perf_counter() - self.start_time) * 1000  # en ms
+        self.end_timing()
+        solve_time = (self.end_time - self.start_time) * 1000 - self._io_before_end  # en ms, hors écritures
 
-        try:
-            final_memory = psutil.Process().memory_info().rss / (1024 * 1024)
-            peak_memory = max(self.initial_memory, final_memory)
-        except:
-            peak_memory = 0
+        peak_memory = self.memory.stop()
+        alloc_peak = self.allocations.stop() if self.trace_allocations else None
 
         file_size = os.path.getsize(filename) if os.path.exists(filename) else 0
 
@@ -70,17 +94,24 @@ class SolverMetricsLogger:
             "solve_time_ms": round(solve_time, 2),
             "ram_peak_mb": round(peak_memory, 2),
             "file_size_bytes": file_size,
-            "nodes_explored": self.nodes_explored,
-            "path_length": self.path_length
+            "nodes_explored": self.nodes_explored if self.counting else "",
+            "path_length": self.path_length,
+            "metrics_level": self.level,
+            "py_alloc_peak_mb": round(alloc_peak, 2) if alloc_peak is not None else "",
+            "profile_file": os.path.basename(self.profiler.save(filename)) if self.profiler is not None else ""
         })
+        for name in self.PHASES:
+            self.current_metrics[f"phase_{name}_ms"] = round(self.phases.get(name), 2)
 
-        with open(self.csv_file, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            row = [self.current_metrics[col] for col in self.columns]
-            writer.writerow(row)
+        if self.sink is not None:  # None : mesures non enregistrées (échauffement)
+            self.sink.write({col: self.current_metrics.get(col, "") for col in self.columns})
 
         self.start_time = None
 
+    def flush(self):
+        if self.sink is not None:
+            self.sink.flush()
+
     def print_metrics(self):
         print("\n" + "="*30)
         print("RÉSUMÉ DES MÉTRIQUES SOLVEUR")